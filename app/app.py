@@ -1,6 +1,9 @@
+import hashlib
+import hmac
+import json
 import logging
 import traceback
-from flask import render_template, request, jsonify
+from flask import render_template, request, jsonify, redirect, url_for
 from datetime import datetime
 
 # Set up logging
@@ -9,22 +12,108 @@ logger = logging.getLogger(__name__)
 
 # Import app configuration
 from config import create_app, db, logger
-from models import TrinoVersion, VersionComparison, ConnectorChange
-from scraper import fetch_trino_changes
+from models import TrinoVersion, VersionComparison, ConnectorChange, ReleaseNote
+from scraper import fetch_trino_changes, comparison_etag, build_changes, comparison_cache_stats
+from cache import LRUCache
+from jobs import JobManager, JobQueueFull
+from search import search_changes, CHANGE_TYPES, MAX_PER_PAGE
+import codec
+import metrics
+from metrics import CACHE_REQUESTS, REQUEST_SECONDS, timed
+from connectors import identify_connector, register_connector
 
 # Create Flask app
 app = create_app()
 
+# Per-process cache of encoded compare responses, keyed by canonical version range
+compare_cache = LRUCache(app.config["COMPARE_LRU_SIZE"], app.config["COMPARE_LRU_TTL"])
+# Organized comparisons, so the changes of each connector can be paged through
+comparison_objects = LRUCache(app.config["COMPARE_OBJECT_LRU_SIZE"], app.config["COMPARE_LRU_TTL"])
+
+# Version and connector lists of the compare page, keyed by release_lists_generation()
+release_lists_cache = LRUCache(1, app.config["COMPARE_LRU_TTL"])
+
+# Bounded pool running asynchronous comparison jobs off the request threads
+comparison_jobs = JobManager(
+    max_workers=app.config["COMPARE_JOB_WORKERS"],
+    max_pending=app.config["COMPARE_JOB_MAX_PENDING"],
+    job_ttl=app.config["COMPARE_JOB_TTL"]
+)
+
 # Routes
+@app.before_request
+def start_request_timing():
+    metrics.start_request()
+
+@app.after_request
+def record_request_timing(response):
+    """Record request latency and log the stage breakdown of slow requests"""
+    stage_times = metrics.finish_request()
+    if stage_times is None:
+        return response
+    
+    elapsed = stage_times.elapsed()
+    REQUEST_SECONDS.observe(elapsed, endpoint=request.endpoint or 'unknown', method=request.method,
+                            status=response.status_code)
+    
+    slow_ms = app.config["SLOW_REQUEST_MS"]
+    if slow_ms and elapsed * 1000 >= slow_ms:
+        logger.warning(f"Slow request: {request.method} {request.full_path.rstrip('?')} took "
+                       f"{elapsed * 1000:.1f}ms ({stage_times.breakdown()})")
+    return response
+
+@app.after_request
+def compress_response(response):
+    """gzip JSON responses for clients that accept it"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or response.mimetype != 'application/json' or 'Content-Encoding' in response.headers):
+        return response
+    
+    response.vary.add('Accept-Encoding')
+    if not accepts_gzip():
+        return response
+    data = response.get_data()
+    if len(data) < codec.GZIP_MIN_SIZE:
+        return response
+    
+    response.set_data(codec.compress(data, codec.RESPONSE_GZIP_LEVEL))
+    response.headers['Content-Encoding'] = 'gzip'
+    return response
+
 @app.route('/')
 def index():
     """Redirect root to breaking changes page"""
     return breaking_changes()
 
+def release_lists_generation():
+    """Identify the stored versions and connector changes with one indexed lookup
+    
+    Ingesting a release adds TrinoVersion and ConnectorChange rows, and
+    rebuilding a changed release replaces its rows, so the highest IDs change
+    whenever the lists could have; this also catches writes by other processes.
+    """
+    return tuple(db.session.query(
+        db.select(db.func.max(TrinoVersion.id)).scalar_subquery(),
+        db.select(db.func.max(ConnectorChange.id)).scalar_subquery()
+    ).one())
+
+def get_release_lists():
+    """The stored versions (newest first) and connector names, cached in process until new data is stored"""
+    generation = release_lists_generation()
+    cached = release_lists_cache.get(generation)
+    if cached:
+        return cached
+    
+    versions = [row[0] for row in db.session.query(TrinoVersion.version).order_by(TrinoVersion.version_number.desc()).all()]
+    connectors = [row[0] for row in db.session.query(ConnectorChange.connector_name).distinct().all()]
+    release_lists_cache.set(generation, (versions, connectors))
+    return versions, connectors
+
 @app.route('/breaking_changes')
 def breaking_changes():
     """Page for displaying breaking changes and feature comparisons between Trino versions"""
-    versions = [v.version for v in TrinoVersion.query.order_by(TrinoVersion.version.desc()).all()]
+    # Versions in descending order (newest first), connectors for the filter dropdown
+    versions, connector_list = get_release_lists()
     
     # If no versions in database, add some common ones
     if not versions:
@@ -32,14 +121,7 @@ def breaking_changes():
         for version in common_versions:
             db.session.add(TrinoVersion(version=version))
         db.session.commit()
-        versions = common_versions
-    
-    # Sort versions in descending order (newest first)
-    versions.sort(key=lambda x: int(x), reverse=True)
-    
-    # Get connectors list for the filter dropdown
-    connectors = db.session.query(ConnectorChange.connector_name).distinct().all()
-    connector_list = [c[0] for c in connectors]
+        versions = sorted(common_versions, key=int, reverse=True)
     
     return render_template('breaking_changes.html', versions=versions, connectors=connector_list)
 
@@ -48,7 +130,9 @@ def connector_changes(connector_name):
     """API endpoint to get all changes for a specific connector"""
     try:
         # Get all changes for the connector from the database
-        changes = ConnectorChange.query.filter_by(connector_name=connector_name).all()
+        changes = ConnectorChange.query.filter_by(connector_name=connector_name).order_by(
+            ConnectorChange.version_number, ConnectorChange.id
+        ).all()
         
         result = {
             'connector': connector_name,
@@ -75,24 +159,212 @@ def connector_changes(connector_name):
         logger.error(f"Error fetching connector changes: {str(e)}")
         return jsonify({'error': f"Error fetching connector changes: {str(e)}"}), 500
 
-@app.route('/api/compare_versions', methods=['POST'])
-def compare_versions():
-    """API endpoint to compare breaking changes and features between two Trino versions"""
-    from_version = request.form.get('from_version', '')
-    to_version = request.form.get('to_version', '')
+# Limits of /api/upgrade_impact requests
+MAX_IMPACT_CONNECTORS = 50
+MAX_IMPACT_PER_PAGE = 500
+
+def resolve_connector_names(names):
+    """Map requested connector names to the names stored in connector_change, case-insensitively
     
-    if not from_version or not to_version:
-        return jsonify({'error': 'Both from_version and to_version are required'}), 400
+    Returns (stored_names, unknown_names).
+    """
+    _, connector_names = get_release_lists()
+    stored = {name.lower(): name for name in connector_names}
+    resolved = []
+    unknown = []
+    for name in names:
+        if name.lower() in stored:
+            if stored[name.lower()] not in resolved:
+                resolved.append(stored[name.lower()])
+        else:
+            unknown.append(name)
+    return resolved, unknown
+
+@app.route('/api/upgrade_impact')
+def upgrade_impact():
+    """API endpoint reporting the changes of several connectors over an upgrade range
+    
+    Query parameters: connectors (comma-separated, or repeated connector
+    parameters), from_version and to_version (changes after from_version up to
+    and including to_version), summary=true for counts only, page and per_page.
+    Changes are ordered by connector, version and position in the release notes
+    and paginated across connectors; counts always cover the whole range.
+    """
+    names = [name.strip() for value in request.args.getlist('connectors') for name in value.split(',')]
+    names += [name.strip() for name in request.args.getlist('connector')]
+    names = [name for name in names if name]
+    if not names:
+        return jsonify({'error': 'At least one connector is required'}), 400
+    if len(names) > MAX_IMPACT_CONNECTORS:
+        return jsonify({'error': f"At most {MAX_IMPACT_CONNECTORS} connectors can be checked at once"}), 400
+    
+    from_version = request.args.get('from_version', '').strip()
+    to_version = request.args.get('to_version', '').strip()
+    error = validate_versions(from_version, to_version)
+    if error:
+        return error
+    from_version, to_version = canonical_versions(from_version, to_version)
+    
+    summary_only = request.args.get('summary', '').lower() in ('1', 'true', 'yes')
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', 100)), 1), MAX_IMPACT_PER_PAGE)
+    except ValueError:
+        return jsonify({'error': 'page and per_page must be numbers'}), 400
     
     try:
-        # Get the comparison data
-        comparison_data = fetch_trino_changes(from_version, to_version, app, db)
+        connectors, unknown = resolve_connector_names(names)
+        
+        result = {
+            'from_version': from_version,
+            'to_version': to_version,
+            'connectors': {
+                connector: {'total': 0, 'counts': {'breaking': 0, 'feature': 0}}
+                for connector in connectors
+            },
+            'unknown_connectors': unknown
+        }
+        if not connectors:
+            return jsonify(result)
+        
+        # Both queries are range scans of ix_connector_change_connector_version
+        in_range = db.and_(
+            ConnectorChange.connector_name.in_(connectors),
+            ConnectorChange.version_number > int(from_version),
+            ConnectorChange.version_number <= int(to_version)
+        )
+        counts = db.session.query(
+            ConnectorChange.connector_name, ConnectorChange.change_type, db.func.count(ConnectorChange.id)
+        ).filter(in_range).group_by(ConnectorChange.connector_name, ConnectorChange.change_type).all()
+        
+        total = 0
+        for connector, change_type, count in counts:
+            connector_result = result['connectors'][connector]
+            connector_result['counts'][change_type] = count
+            connector_result['total'] += count
+            total += count
+        result['total'] = total
         
-        # Organize changes by connector
-        connector_changes = {}
+        if summary_only:
+            return jsonify(result)
         
-        # Process breaking changes by connector and store in ConnectorChange model
-        for change in comparison_data.get('breaking_changes', []):
+        changes = ConnectorChange.query.filter(in_range).order_by(
+            ConnectorChange.connector_name, ConnectorChange.version_number, ConnectorChange.id
+        ).offset((page - 1) * per_page).limit(per_page).all()
+        
+        for connector in connectors:
+            result['connectors'][connector]['changes'] = []
+        for change in changes:
+            result['connectors'][change.connector_name]['changes'].append({
+                'version': change.version,
+                'change_type': change.change_type,
+                'impact': change.impact,
+                'description': change.description
+            })
+        result['page'] = page
+        result['per_page'] = per_page
+        result['has_more'] = page * per_page < total
+        return jsonify(result)
+    
+    except Exception as e:
+        logger.error(f"Error fetching upgrade impact: {str(e)}")
+        return jsonify({'error': f"Error fetching upgrade impact: {str(e)}"}), 500
+
+@app.route('/api/search')
+def search():
+    """API endpoint for full-text search over all stored release note items
+    
+    Query parameters: q (words and "quoted phrases", all required), connector,
+    from_version, to_version, type (breaking or feature), page and per_page.
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'A search query (q) is required'}), 400
+    
+    change_type = request.args.get('type') or None
+    if change_type and change_type not in CHANGE_TYPES:
+        return jsonify({'error': f"type must be one of: {', '.join(CHANGE_TYPES)}"}), 400
+    
+    try:
+        from_number = int(request.args['from_version']) if request.args.get('from_version') else None
+        to_number = int(request.args['to_version']) if request.args.get('to_version') else None
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', 20)), 1), MAX_PER_PAGE)
+    except ValueError:
+        return jsonify({'error': 'Versions, page and per_page must be numbers'}), 400
+    
+    try:
+        return jsonify(search_changes(
+            query,
+            connector=request.args.get('connector') or None,
+            from_number=from_number,
+            to_number=to_number,
+            change_type=change_type,
+            page=page,
+            per_page=per_page
+        ))
+    except Exception as e:
+        logger.error(f"Error searching release notes: {str(e)}")
+        return jsonify({'error': f"Error searching release notes: {str(e)}"}), 500
+
+# Releases newer than the highest stored one that a range may ask for; any
+# further and a request could fan out to the release site for pages that
+# cannot exist yet
+MAX_VERSIONS_AHEAD = 10
+
+# Highest stored version seen by this process. Stored versions only grow, so it
+# is only looked up again when a range seems to go past it, and ranges that
+# are served from the in-process caches never touch the database for it.
+_newest_version = None
+
+def newest_stored_version():
+    """The highest version stored as a known version or as release notes, or None"""
+    # Releases scraped on demand are only stored as release notes
+    newest = db.session.query(
+        db.select(db.func.max(TrinoVersion.version_number)).scalar_subquery(),
+        db.select(db.func.max(ReleaseNote.version_number)).scalar_subquery()
+    ).one()
+    return max((number for number in newest if number is not None), default=None)
+
+def validate_versions(from_version, to_version):
+    """Return an error response if a requested version range is unusable, else None"""
+    global _newest_version
+    
+    if not from_version or not to_version:
+        return jsonify({'error': 'Both from_version and to_version are required'}), 400
+    try:
+        newer = int(canonical_versions(from_version, to_version)[1])
+    except ValueError:
+        return jsonify({'error': 'Versions must be Trino release numbers'}), 400
+    
+    if _newest_version is None or newer > _newest_version + MAX_VERSIONS_AHEAD:
+        try:
+            _newest_version = newest_stored_version()
+        except Exception as e:
+            logger.error(f"Error loading the newest stored version: {str(e)}")
+    if _newest_version is not None and newer > _newest_version + MAX_VERSIONS_AHEAD:
+        return jsonify({'error': f"Versions newer than {_newest_version + MAX_VERSIONS_AHEAD} are not released yet"}), 400
+    return None
+
+def canonical_versions(from_version, to_version):
+    """Normalize a version range to (older, newer) release numbers, raising ValueError if invalid"""
+    versions = sorted(int(version) for version in (from_version, to_version))
+    if versions[0] < 0:
+        raise ValueError(f"Negative version: {versions[0]}")
+    return str(versions[0]), str(versions[1])
+
+def organize_by_connector(comparison_data):
+    """Group the items of comparison data by the connector they refer to"""
+    connector_changes = {}
+    
+    # Connectors with their own release notes section are known before classifying
+    for feature in comparison_data.get('new_features', []):
+        if feature.get('connector'):
+            register_connector(feature['connector'])
+    
+    for section, change_list in (('breaking_changes', comparison_data.get('breaking_changes', [])),
+                                 ('new_features', comparison_data.get('new_features', []))):
+        for change in change_list:
             version = change.get('version')
             for item in change.get('items', []):
                 # Try to identify the connector from the item text
@@ -104,86 +376,150 @@ def compare_versions():
                         'other_changes': []
                     }
                 
-                connector_changes[connector]['breaking_changes'].append({
-                    'version': version,
-                    'description': item
-                })
-                
-                # Store in ConnectorChange model for future quick lookup
-                try:
-                    # Check if this change is already stored
-                    existing_change = ConnectorChange.query.filter_by(
-                        connector_name=connector,
-                        version=version,
-                        change_type='breaking',
-                        description=item
-                    ).first()
-                    
-                    if not existing_change:
-                        new_change = ConnectorChange(
-                            connector_name=connector,
-                            version=version,
-                            change_type='breaking',
-                            description=item,
-                            impact='high'  # Default impact for breaking changes
-                        )
-                        db.session.add(new_change)
-                except Exception as e:
-                    logger.error(f"Error storing connector change: {str(e)}")
-        
-        # Process new features by connector and store in ConnectorChange model
-        for feature in comparison_data.get('new_features', []):
-            version = feature.get('version')
-            for item in feature.get('items', []):
-                connector = identify_connector(item)
-                if connector not in connector_changes:
-                    connector_changes[connector] = {
-                        'breaking_changes': [],
-                        'new_features': [],
-                        'other_changes': []
-                    }
-                
-                connector_changes[connector]['new_features'].append({
+                connector_changes[connector][section].append({
                     'version': version,
                     'description': item
                 })
-                
-                # Store in ConnectorChange model for future quick lookup
-                try:
-                    # Check if this feature is already stored
-                    existing_feature = ConnectorChange.query.filter_by(
-                        connector_name=connector,
-                        version=version,
-                        change_type='feature',
-                        description=item
-                    ).first()
-                    
-                    if not existing_feature:
-                        new_feature = ConnectorChange(
-                            connector_name=connector,
-                            version=version,
-                            change_type='feature',
-                            description=item,
-                            impact='medium'  # Default impact for features
-                        )
-                        db.session.add(new_feature)
-                except Exception as e:
-                    logger.error(f"Error storing connector feature: {str(e)}")
-        
-        # Commit all the new changes to the database
-        try:
-            db.session.commit()
-            logger.info(f"Successfully stored connector changes for versions {from_version} to {to_version}")
-        except Exception as e:
-            db.session.rollback()
-            logger.error(f"Error committing connector changes: {str(e)}")
-        
-        return jsonify({
-            'connectors': connector_changes,
-            'from_version': from_version,
-            'to_version': to_version
-        })
+    
+    return connector_changes
+
+# Releases that could not be fetched, or were not published yet, when a
+# comparison was built; only present on incomplete comparisons
+INCOMPLETE_KEYS = ('missing_versions', 'stale_versions', 'unpublished_versions')
+# Incomplete comparisons are kept just long enough for clients to page through
+# the connectors of the summary they got, then rebuilt
+INCOMPLETE_COMPARISON_TTL = 30
+
+def is_incomplete(comparison):
+    return any(comparison.get(key) for key in INCOMPLETE_KEYS)
+
+def build_comparison(from_version, to_version, progress=None):
+    """Build the compare response for a canonical version range, organized by connector"""
+    # Get the comparison data. The matching ConnectorChange rows are written by
+    # the scraper when a release is first stored.
+    comparison_data = fetch_trino_changes(from_version, to_version, app, db, progress=progress)
+    
+    comparison = {
+        'connectors': organize_by_connector(comparison_data),
+        'from_version': from_version,
+        'to_version': to_version
+    }
+    for key in INCOMPLETE_KEYS:
+        if comparison_data.get(key):
+            comparison[key] = comparison_data[key]
+    return comparison
+
+def get_comparison(from_version, to_version, progress=None):
+    """The comparison of a canonical range and its ETag, kept in process so per-connector requests can page through it"""
+    cache_key = (from_version, to_version)
+    cached = comparison_objects.get(cache_key)
+    if cached:
+        return cached
+    
+    comparison = build_comparison(from_version, to_version, progress=progress)
+    # Releases may have been scraped while building, so hash the final data
+    etag, _ = comparison_etag(from_version, to_version, app, db)
+    comparison_objects.set(cache_key, (etag, comparison),
+                           ttl=INCOMPLETE_COMPARISON_TTL if is_incomplete(comparison) else None)
+    return etag, comparison
+
+def summarize_comparison(comparison):
+    """The compare response with per-connector counts in place of the changes"""
+    summary = {
+        'connectors': {
+            connector: {section: len(items) for section, items in changes.items()}
+            for connector, changes in comparison['connectors'].items()
+        },
+        'from_version': comparison['from_version'],
+        'to_version': comparison['to_version'],
+        'summary': True
+    }
+    for key in INCOMPLETE_KEYS:
+        if comparison.get(key):
+            summary[key] = comparison[key]
+    return summary
+
+def accepts_gzip():
+    return request.accept_encodings.quality('gzip') > 0
+
+def representation_etag(etag, gzipped, summary=False):
+    """The summary and the gzip-encoded body of a comparison are different representations with their own strong ETags"""
+    if summary:
+        etag = f"{etag}-summary"
+    return f"{etag}-gzip" if gzipped else etag
+
+def not_modified(etag):
+    """Empty 304 response for a comparison the client already has"""
+    response = app.response_class(status=304)
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    set_compare_cache_headers(response)
+    return response
+
+def set_compare_cache_headers(response, incomplete=False):
+    if incomplete:
+        # Clients and proxies must come back for the releases that are missing
+        response.cache_control.no_cache = True
+        return
+    response.cache_control.public = True
+    response.cache_control.max_age = app.config["COMPARE_CACHE_MAX_AGE"]
+
+@app.route('/api/compare_versions', methods=['GET', 'POST'])
+def compare_versions():
+    """API endpoint to compare breaking changes and features between two Trino versions"""
+    values = request.args if request.method == 'GET' else request.form
+    from_version = values.get('from_version', '').strip()
+    to_version = values.get('to_version', '').strip()
+    summary = values.get('summary', '').lower() in ('1', 'true', 'yes')
+    
+    error = validate_versions(from_version, to_version)
+    if error:
+        return error
+    canonical_from, canonical_to = canonical_versions(from_version, to_version)
+    
+    if request.method == 'GET' and (from_version, to_version) != (canonical_from, canonical_to):
+        return redirect(url_for('compare_versions', from_version=canonical_from, to_version=canonical_to,
+                                **({'summary': 'true'} if summary else {})), 301)
+    
+    try:
+        cache_key = (canonical_from, canonical_to, summary)
+        gzipped = accepts_gzip()
+        with timed('cache_lookup'):
+            cached = compare_cache.get(cache_key)
+        CACHE_REQUESTS.inc(cache='memory', result='hit' if cached else 'miss')
+        incomplete = False
+        if cached:
+            etag, body, gzipped_body = cached
+        else:
+            with timed('cache_lookup'):
+                etag, complete = comparison_etag(canonical_from, canonical_to, app, db)
+            if (request.method == 'GET' and complete
+                    and request.if_none_match.contains(representation_etag(etag, gzipped, summary))):
+                CACHE_REQUESTS.inc(cache='http', result='hit')
+                return not_modified(representation_etag(etag, gzipped, summary))
+            
+            etag, comparison = get_comparison(canonical_from, canonical_to)
+            incomplete = is_incomplete(comparison)
+            if summary:
+                comparison = summarize_comparison(comparison)
+            with timed('serialize'):
+                body = codec.dumps(comparison)
+                gzipped_body = codec.compress(body, codec.RESPONSE_GZIP_LEVEL)
+            if not incomplete:
+                compare_cache.set(cache_key, (etag, body, gzipped_body))
         
+        response = app.response_class(gzipped_body if gzipped else body, mimetype='application/json')
+        if gzipped:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        if request.method == 'GET':
+            response.set_etag(representation_etag(etag, gzipped, summary))
+            set_compare_cache_headers(response, incomplete)
+            response.make_conditional(request)
+            if response.status_code == 304:
+                CACHE_REQUESTS.inc(cache='http', result='hit')
+        return response
+    
     except Exception as e:
         logger.error(f"Error comparing versions: {str(e)}")
         logger.error(traceback.format_exc())
@@ -191,53 +527,199 @@ def compare_versions():
             'error': f"Error comparing versions: {str(e)}"
         }), 500
 
-def identify_connector(text):
-    """Try to extract connector name from text"""
-    # List of common Trino connectors
-    known_connectors = [
-        'bigquery', 'clickhouse', 'delta lake', 'elasticsearch', 'hive', 'iceberg', 
-        'jdbc', 'kafka', 'mongodb', 'mysql', 'oracle', 'postgresql', 'redis', 
-        'redshift', 'sqlserver', 'snowflake', 'phoenix', 'pinot', 'mariadb',
-        'cassandra', 'accumulo', 'druid', 'kudu', 'memory', 'thrift'
-    ]
-    
-    # Check for connector mentions in the text
-    text_lower = text.lower()
-    
-    for connector in known_connectors:
-        if connector in text_lower or connector.replace(' ', '') in text_lower:
-            # Return standardized connector name (with proper capitalization)
-            if connector == 'bigquery':
-                return 'BigQuery'
-            elif connector == 'clickhouse':
-                return 'ClickHouse'
-            elif connector == 'delta lake':
-                return 'Delta Lake'
-            elif connector == 'elasticsearch':
-                return 'Elasticsearch'
-            elif connector == 'sqlserver':
-                return 'SQL Server'
-            else:
-                # Capitalize first letter of each word
-                return ' '.join(word.capitalize() for word in connector.split())
-    
-    # Check for connector format like "X connector" or "X Connector"
-    connector_match = text_lower.split(' connector')[0].split()
-    if connector_match and len(connector_match) > 0:
-        last_word = connector_match[-1]
-        if len(last_word) > 2 and any(c.isalpha() for c in last_word):
-            return last_word.capitalize()
-    
-    # If no specific connector is identified, categorize as General
-    return 'General'
+COMPARE_SECTIONS = ('breaking_changes', 'new_features')
+MAX_CONNECTOR_PER_PAGE = 500
+
+@app.route('/api/compare_connector')
+def compare_connector():
+    """API endpoint paging through the changes of one connector in a version comparison
+    
+    Query parameters: from_version, to_version, connector, section
+    (breaking_changes or new_features, default both), page and per_page.
+    Each requested section is paged separately and reports its total.
+    """
+    from_version = request.args.get('from_version', '').strip()
+    to_version = request.args.get('to_version', '').strip()
+    error = validate_versions(from_version, to_version)
+    if error:
+        return error
+    from_version, to_version = canonical_versions(from_version, to_version)
+    
+    connector = request.args.get('connector', '').strip()
+    if not connector:
+        return jsonify({'error': 'A connector is required'}), 400
+    section = request.args.get('section')
+    if section and section not in COMPARE_SECTIONS:
+        return jsonify({'error': f"section must be one of: {', '.join(COMPARE_SECTIONS)}"}), 400
+    try:
+        page = max(int(request.args.get('page', 1)), 1)
+        per_page = min(max(int(request.args.get('per_page', 50)), 1), MAX_CONNECTOR_PER_PAGE)
+    except ValueError:
+        return jsonify({'error': 'page and per_page must be numbers'}), 400
+    
+    try:
+        _, comparison = get_comparison(from_version, to_version)
+        changes = comparison['connectors'].get(connector)
+        if changes is None:
+            return jsonify({'error': f"No changes for connector {connector} between {from_version} and {to_version}"}), 404
+        
+        start = (page - 1) * per_page
+        result = {
+            'connector': connector,
+            'from_version': from_version,
+            'to_version': to_version,
+            'page': page,
+            'per_page': per_page,
+            'has_more': False
+        }
+        for name in ([section] if section else COMPARE_SECTIONS):
+            items = changes[name]
+            result[name] = {'total': len(items), 'items': items[start:start + per_page]}
+            result['has_more'] = result['has_more'] or start + per_page < len(items)
+        
+        response = jsonify(result)
+        response.set_etag(hashlib.sha1(response.get_data()).hexdigest(), weak=True)
+        set_compare_cache_headers(response, is_incomplete(comparison))
+        return response.make_conditional(request)
+    
+    except Exception as e:
+        logger.error(f"Error fetching connector comparison: {str(e)}")
+        return jsonify({'error': f"Error fetching connector comparison: {str(e)}"}), 500
+
+def run_comparison_job(job):
+    """Build a comparison for a job, streaming each release as it becomes available"""
+    def progress(version, release):
+        job.completed += 1
+        partial = {}
+        if release:
+            partial = organize_by_connector(build_changes([version], {version: release}))
+        job.emit('progress', {
+            'version': version,
+            'available': release is not None,
+            'completed': job.completed,
+            'total': job.total,
+            'connectors': partial
+        })
+    
+    with app.app_context():
+        # The details of each connector are then paged through with /api/compare_connector
+        _, comparison = get_comparison(job.from_version, job.to_version, progress=progress)
+        return summarize_comparison(comparison)
+
+@app.route('/api/compare_jobs', methods=['POST'])
+def start_compare_job():
+    """API endpoint to start an asynchronous version comparison
+    
+    Returns 202 with the job ID right away; progress is available from the
+    status URL (polling) or the events URL (Server-Sent Events, see DEPLOYMENT.md).
+    """
+    values = request.get_json(silent=True) or request.form
+    from_version = str(values.get('from_version', '')).strip()
+    to_version = str(values.get('to_version', '')).strip()
+    
+    error = validate_versions(from_version, to_version)
+    if error:
+        return error
+    from_version, to_version = canonical_versions(from_version, to_version)
+    
+    try:
+        job = comparison_jobs.submit(from_version, to_version, int(to_version) - int(from_version), run_comparison_job)
+    except JobQueueFull as e:
+        logger.warning(f"Rejecting comparison job: {str(e)}")
+        return jsonify({'error': 'Too many comparisons are running, please try again shortly'}), 503
+    
+    data = job.to_dict(include_result=False)
+    data['status_url'] = url_for('compare_job_status', job_id=job.id)
+    data['events_url'] = url_for('compare_job_events', job_id=job.id)
+    return jsonify(data), 202
+
+@app.route('/api/compare_jobs/<job_id>')
+def compare_job_status(job_id):
+    """API endpoint to poll the status of a comparison job, including its result once done"""
+    job = comparison_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f"Unknown comparison job {job_id}"}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/api/compare_jobs/<job_id>/events')
+def compare_job_events(job_id):
+    """Server-Sent Events stream of a comparison job's progress and result"""
+    job = comparison_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': f"Unknown comparison job {job_id}"}), 404
+    
+    # Reconnecting EventSource clients resume after the last event they saw
+    try:
+        start = int(request.headers.get('Last-Event-ID', -1)) + 1
+    except ValueError:
+        start = 0
+    
+    def stream():
+        index = start
+        while True:
+            events = job.wait_for_events(index, timeout=15)
+            if not events:
+                if job.is_finished():
+                    return
+                yield ": keep-alive\n\n"
+                continue
+            for event, data in events:
+                yield f"id: {index}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+                index += 1
+                if event in ('done', 'failed'):
+                    return
+    
+    return app.response_class(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+def admin_authorized():
+    """Admin endpoints require ADMIN_TOKEN as a bearer token when it is configured"""
+    token = app.config.get("ADMIN_TOKEN")
+    if not token:
+        return True
+    return hmac.compare_digest(request.headers.get('Authorization', ''), f"Bearer {token}")
+
+@app.route('/api/admin/cache_stats')
+def cache_stats():
+    """API endpoint reporting the size and hit statistics of the comparison caches"""
+    if not admin_authorized():
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        return jsonify({
+            # Snapshots have no comparison cache table
+            'comparison_cache': None if app.config["READ_ONLY"] else comparison_cache_stats(app, db),
+            'snapshot': app.config.get("SNAPSHOT_INFO"),
+            'memory_cache': {
+                'entries': len(compare_cache),
+                'max_entries': app.config["COMPARE_LRU_SIZE"],
+                'hits': CACHE_REQUESTS.value(cache='memory', result='hit'),
+                'misses': CACHE_REQUESTS.value(cache='memory', result='miss')
+            }
+        })
+    except Exception as e:
+        logger.error(f"Error fetching cache stats: {str(e)}")
+        return jsonify({'error': f"Error fetching cache stats: {str(e)}"}), 500
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Prometheus metrics of this process: request and stage latencies, cache and fetch counters"""
+    return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 # Initialize database
 def init_db():
+    if app.config["READ_ONLY"]:
+        return
+    from migrations import upgrade_schema
+    
     with app.app_context():
         try:
             # Create the database tables
             db.create_all()
             logger.info("Database tables created")
+            upgrade_schema()
             
             # Add initial versions if the table is empty
             if TrinoVersion.query.count() == 0:
@@ -0,0 +1,482 @@
+import argparse
+import atexit
+import gc
+import glob
+import json
+import logging
+import os
+import resource
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tests', 'fixtures')
+# Release pages saved from trino.io with --save-corpus, also used by the parser tests
+DEFAULT_CORPUS = os.path.join(FIXTURES_DIR, 'releases')
+# Random text in the trino.io layout, only used to pad ranges longer than the saved pages
+GENERATED_CORPUS = os.path.join(FIXTURES_DIR, 'generated')
+
+def load_pages(corpus_dir):
+    """Load saved release-<N>.html pages as (version, html) pairs in version order"""
+    pages = []
+    for path in glob.glob(os.path.join(corpus_dir, 'release-*.html')):
+        version = os.path.basename(path)[len('release-'):-len('.html')]
+        if version.isdigit():
+            with open(path, encoding='utf-8') as f:
+                pages.append((version, f.read()))
+    pages.sort(key=lambda page: int(page[0]))
+    return pages
+
+def load_corpus(corpus_dir):
+    """Load the pages of corpus_dir, failing when there are none"""
+    pages = load_pages(corpus_dir)
+    if not pages:
+        raise SystemExit(f"No release-<N>.html pages found in {corpus_dir}")
+    return pages
+
+def padded_pages(pages, count):
+    """count (version, html) pages numbered up from the first corpus version
+    
+    When the corpus has fewer pages than count the remaining versions reuse the
+    generated pages, so long ranges can be measured with a partial corpus.
+    """
+    padding = load_pages(GENERATED_CORPUS) if count > len(pages) else []
+    first = int(pages[0][0])
+    return [
+        (str(first + i), pages[i][1] if i < len(pages) else padding[(i - len(pages)) % len(padding)][1])
+        for i in range(count)
+    ]
+
+def save_corpus(versions, corpus_dir=DEFAULT_CORPUS, release_url=None):
+    """Download the release pages of versions from the release site into corpus_dir"""
+    from fetcher import DEFAULT_RELEASE_URL, fetch_release_pages
+    
+    os.makedirs(corpus_dir, exist_ok=True)
+    saved = 0
+    for version, result in fetch_release_pages(versions, release_url or DEFAULT_RELEASE_URL, max_workers=4, retries=2):
+        if result is None or result.html is None:
+            logging.warning(f"Not saving version {version}: the page could not be fetched")
+            continue
+        with open(os.path.join(corpus_dir, f'release-{version}.html'), 'w', encoding='utf-8') as f:
+            f.write(result.html)
+        saved += 1
+    return saved
+
+def corpus_items(pages):
+    """Parse the corpus and return every item the classifier would see"""
+    from release_parser import parse_release_notes
+    
+    items = []
+    for _, html in pages:
+        release = parse_release_notes(html)
+        items.extend(release['breaking_changes'])
+        items.extend(release['new_features'])
+        for connector in release['connectors']:
+            items.extend(connector['items'])
+    return items
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+def latency_summary(seconds):
+    """Median, 95th percentile and best of a list of timings, in milliseconds"""
+    return {
+        'median_ms': round(statistics.median(seconds) * 1000, 3),
+        'p95_ms': round(percentile(seconds, 0.95) * 1000, 3),
+        'min_ms': round(min(seconds) * 1000, 3),
+    }
+
+def best_rate(fn, items, repeat):
+    """Best items per second over several runs of fn over items"""
+    best = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(item)
+        best = max(best, len(items) / (time.perf_counter() - start))
+    return best
+
+def bench_classify(pages, repeat=5):
+    """Measure identify_connector throughput, uncached and memoized"""
+    from connectors import connector_classifier, identify_connector
+    
+    items = corpus_items(pages)
+    # Warm the memo once so the memoized figure is the steady state of repeat comparisons
+    for item in items:
+        identify_connector(item)
+    
+    return {
+        'items': len(items),
+        'uncached_items_per_sec': round(best_rate(connector_classifier._classify, items, repeat)),
+        'memoized_items_per_sec': round(best_rate(identify_connector, items, repeat)),
+    }
+
+def time_parser(parse, pages, repeat):
+    """Per-page timings of parse over the corpus and the best time for the whole corpus"""
+    timings = []
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _, html in pages:
+            page_start = time.perf_counter()
+            parse(html)
+            timings.append(time.perf_counter() - page_start)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return timings, best
+
+def bench_parse(pages, repeat=5):
+    """Measure parse time per release page, against the BeautifulSoup parser it replaced if bs4 is installed"""
+    from release_parser import parse_release_notes
+    
+    timings, best = time_parser(parse_release_notes, pages, repeat)
+    page_bytes = sum(len(html.encode('utf-8')) for _, html in pages)
+    results = dict(
+        latency_summary(timings),
+        pages=len(pages),
+        pages_per_sec=round(len(pages) / best, 1),
+        mb_per_sec=round(page_bytes / best / 1e6, 2)
+    )
+    
+    try:
+        from tests.bs4_release_parser import parse_release_notes as parse_with_bs4
+    except ImportError:
+        return results
+    with warnings.catch_warnings():
+        # The reference parser uses BeautifulSoup's deprecated text= argument
+        warnings.simplefilter('ignore', DeprecationWarning)
+        bs4_timings, bs4_best = time_parser(parse_with_bs4, pages, repeat)
+    results['bs4_median_ms'] = round(statistics.median(bs4_timings) * 1000, 3)
+    results['speedup_vs_bs4'] = round(bs4_best / best, 1)
+    return results
+
+_bench_app = None
+
+def bench_app():
+    """The application, set up once per run on a scratch SQLite database that never scrapes"""
+    global _bench_app
+    if _bench_app is None:
+        db_dir = tempfile.mkdtemp(prefix='trino-bench-')
+        atexit.register(shutil.rmtree, db_dir, ignore_errors=True)
+        os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(db_dir, 'bench.db')}"
+        os.environ['SCRAPE_ON_DEMAND'] = 'false'
+        os.environ['SLOW_REQUEST_MS'] = '0'
+        os.environ.pop('SNAPSHOT_PATH', None)
+        logging.getLogger('config').setLevel(logging.WARNING)
+        
+        from main import app, init_db
+        init_db()
+        _bench_app = app
+    return _bench_app
+
+def corpus_releases(pages, count):
+    """count parsed releases numbered up from the first corpus version, padded as by padded_pages"""
+    from release_parser import parse_release_notes
+    
+    parsed = {}
+    releases = []
+    for version, html in padded_pages(pages, count):
+        if html not in parsed:
+            parsed[html] = parse_release_notes(html)
+        releases.append((version, parsed[html]))
+    return releases
+
+def store_releases(releases):
+    """Replace the stored releases with releases, returning the seconds spent writing connector changes"""
+    from config import db
+    from connectors import classify_release
+    from models import ConnectorChange, ReleaseNote, VersionComparison
+    
+    app = bench_app()
+    with app.app_context():
+        for model in (ConnectorChange, ReleaseNote, VersionComparison):
+            model.query.delete()
+        db.session.commit()
+        
+        records = []
+        for version, release in releases:
+            release_note = ReleaseNote(version=version)
+            release_note.set_release_data(release)
+            db.session.add(release_note)
+            records.extend(classify_release(version, release))
+        db.session.commit()
+        
+        start = time.perf_counter()
+        ConnectorChange.insert_many(records)
+        db.session.commit()
+        return time.perf_counter() - start, len(records)
+
+def bench_write(pages, repeat=5):
+    """Measure the cost of writing ConnectorChange rows for the corpus, new and already stored"""
+    from config import db
+    from connectors import classify_release
+    from models import ConnectorChange
+    
+    releases = corpus_releases(pages, len(pages))
+    timings = []
+    for _ in range(repeat):
+        seconds, rows = store_releases(releases)
+        timings.append(seconds)
+    
+    # Rewriting stored rows only costs the conflict checks of the unique index
+    records = [record for version, release in releases for record in classify_release(version, release)]
+    with bench_app().app_context():
+        start = time.perf_counter()
+        ConnectorChange.insert_many(records)
+        db.session.commit()
+        duplicate_seconds = time.perf_counter() - start
+    
+    best = min(timings)
+    return {
+        'releases': len(releases),
+        'rows': rows,
+        'insert_ms': round(statistics.median(timings) * 1000, 3),
+        'rows_per_sec': round(rows / best),
+        'ms_per_release': round(best * 1000 / len(releases), 3),
+        'duplicate_insert_ms': round(duplicate_seconds * 1000, 3),
+    }
+
+COMPARE_RANGES = (5, 50, 300)
+
+def clear_comparison_caches(database=True):
+    """Drop the comparisons cached in process and, if database, in the comparison table"""
+    import app as app_module
+    from config import db
+    from connectors import connector_classifier
+    from models import VersionComparison
+    
+    app_module.compare_cache.clear()
+    app_module.comparison_objects.clear()
+    if database:
+        connector_classifier.classify.cache_clear()
+        with app_module.app.app_context():
+            VersionComparison.query.delete()
+            db.session.commit()
+
+def bench_compare(pages, repeat=5):
+    """Measure /api/compare_versions latency by range size
+    
+    cold: nothing cached, the comparison is built from the stored releases
+    database: served from the comparison table
+    memory: served from the in-process response cache
+    """
+    releases = corpus_releases(pages, max(COMPARE_RANGES))
+    store_releases(releases)
+    client = bench_app().test_client()
+    newest = int(releases[-1][0])
+    
+    def request(size):
+        start = time.perf_counter()
+        response = client.get(f'/api/compare_versions?from_version={newest - size}&to_version={newest}',
+                              headers={'Accept-Encoding': 'gzip'})
+        seconds = time.perf_counter() - start
+        if response.status_code != 200:
+            raise RuntimeError(f"compare_versions returned {response.status_code}: {response.get_data(as_text=True)}")
+        return seconds, len(response.get_data())
+    
+    results = {}
+    for size in COMPARE_RANGES:
+        cold, database, memory = [], [], []
+        for _ in range(repeat):
+            clear_comparison_caches()
+            seconds, response_bytes = request(size)
+            cold.append(seconds)
+            clear_comparison_caches(database=False)
+            database.append(request(size)[0])
+            memory.append(request(size)[0])
+        results[f'{size}_releases'] = {
+            'cold': latency_summary(cold),
+            'database': latency_summary(database),
+            'memory': latency_summary(memory),
+            'response_bytes': response_bytes,
+        }
+    results['generated_releases'] = max(max(COMPARE_RANGES) - len(pages), 0)
+    return results
+
+def traced_peak(fn):
+    """Peak Python heap allocated while running fn, in MB"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        return round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+    finally:
+        tracemalloc.stop()
+
+def bench_memory(pages, repeat=1):
+    """Measure peak memory of parsing the corpus and of building the largest comparison"""
+    from release_parser import parse_release_notes
+    
+    size = max(COMPARE_RANGES)
+    releases = corpus_releases(pages, size)
+    store_releases(releases)
+    client = bench_app().test_client()
+    newest = int(releases[-1][0])
+    clear_comparison_caches()
+    
+    return {
+        'parse_corpus_peak_mb': traced_peak(lambda: [parse_release_notes(html) for _, html in pages]),
+        f'compare_{size}_releases_peak_mb': traced_peak(
+            lambda: client.get(f'/api/compare_versions?from_version={newest - size}&to_version={newest}')
+        ),
+        # Linux reports ru_maxrss in kilobytes
+        'max_rss_mb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+# Releases in a full backfill, the size of a reparse
+BACKFILL_RELEASES = 470
+
+def bench_parse_pool(pages, repeat=3):
+    """Measure parse and classify throughput of a full backfill with 1 to N parse processes
+    
+    total includes starting the worker processes; steady reuses a started pool.
+    parent_cpu_ms is the CPU time of this process in a steady run: work that
+    does not spread over the workers and bounds the speedup on more cores.
+    The corpus is padded with the generated pages to make up a full backfill.
+    """
+    from parse_pool import parse_pages, parse_pool
+    
+    backfill = padded_pages(pages, BACKFILL_RELEASES)
+    worker_counts = [1]
+    while worker_counts[-1] < max(os.cpu_count() or 1, 2):
+        worker_counts.append(worker_counts[-1] * 2)
+    
+    results = {'pages': len(backfill), 'generated_pages': max(BACKFILL_RELEASES - len(pages), 0),
+               'cpus': os.cpu_count()}
+    for workers in worker_counts:
+        totals, steady, parent_cpu = [], [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            with parse_pool(workers) as executor:
+                for _ in parse_pages(backfill, executor):
+                    pass
+                totals.append(time.perf_counter() - start)
+                
+                start = time.perf_counter()
+                cpu_start = time.process_time()
+                for _ in parse_pages(backfill, executor):
+                    pass
+                steady.append(time.perf_counter() - start)
+                parent_cpu.append(time.process_time() - cpu_start)
+        
+        results[f'{workers}_workers'] = {
+            'total_ms': round(statistics.median(totals) * 1000, 1),
+            'steady_ms': round(statistics.median(steady) * 1000, 1),
+            'parent_cpu_ms': round(statistics.median(parent_cpu) * 1000, 1),
+            'pages_per_sec': round(len(backfill) / min(steady), 1),
+        }
+    
+    serial = results['1_workers']['pages_per_sec']
+    for workers in worker_counts:
+        results[f'{workers}_workers']['speedup'] = round(results[f'{workers}_workers']['pages_per_sec'] / serial, 2)
+    return results
+
+# Modules a web process serving stored releases should not need to load
+SCRAPING_MODULES = ('requests', 'urllib3', 'fetcher', 'release_parser')
+
+def startup_probe(from_version, to_version):
+    """Run in a fresh process by bench_startup: time the WSGI import and the first requests"""
+    start = time.perf_counter()
+    from main import app
+    imported = time.perf_counter()
+    
+    # Templates are deployed next to the application, but live in public_html in the repository
+    if not os.path.isdir(os.path.join(app.root_path, 'templates')):
+        app.template_folder = os.path.join(app.root_path, '..', 'public_html', 'templates')
+    client = app.test_client()
+    
+    timings = {'import_ms': (imported - start) * 1000}
+    for name, url in (('first_page_ms', '/breaking_changes'),
+                      ('second_page_ms', '/breaking_changes'),
+                      ('first_compare_ms', f'/api/compare_versions?from_version={from_version}&to_version={to_version}')):
+        request_start = time.perf_counter()
+        response = client.get(url)
+        timings[name] = (time.perf_counter() - request_start) * 1000
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} returned {response.status_code}")
+    timings['scraping_modules_loaded'] = [name for name in SCRAPING_MODULES if name in sys.modules]
+    print(json.dumps(timings))
+
+def bench_startup(pages, repeat=5):
+    """Measure the start of a fresh web process: import, first page render and first comparison"""
+    releases = corpus_releases(pages, len(pages))
+    store_releases(releases)
+    to_version = int(releases[-1][0])
+    from_version = max(to_version - 5, int(releases[0][0]) - 1)
+    
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = subprocess.run(
+            [sys.executable, '-c', f"import bench; bench.startup_probe({from_version}, {to_version})"],
+            cwd=os.path.dirname(os.path.abspath(__file__)), env=os.environ,
+            capture_output=True, text=True, check=True
+        ).stdout
+        run = json.loads(output.strip().splitlines()[-1])
+        run['process_ms'] = (time.perf_counter() - start) * 1000
+        runs.append(run)
+    
+    result = {
+        name: round(statistics.median(run[name] for run in runs), 3)
+        for name in ('process_ms', 'import_ms', 'first_page_ms', 'second_page_ms', 'first_compare_ms')
+    }
+    result['scraping_modules_loaded'] = runs[-1]['scraping_modules_loaded']
+    return result
+
+BENCHMARKS = {
+    'parse': bench_parse,
+    'classify': bench_classify,
+    'parse_pool': bench_parse_pool,
+    'write': bench_write,
+    'compare': bench_compare,
+    'memory': bench_memory,
+    'startup': bench_startup,
+}
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Offline benchmarks over a saved release notes corpus")
+    parser.add_argument('benchmarks', nargs='*', metavar='benchmark',
+                        help=f"Benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    parser.add_argument('--corpus', default=DEFAULT_CORPUS,
+                        help="Directory of saved release-<N>.html pages (default: the saved test fixtures, "
+                             "or the generated ones while none are saved)")
+    parser.add_argument('--save-corpus', metavar='FIRST-LAST',
+                        help="Download the release pages FIRST to LAST from the release site into --corpus and exit")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help="Also write the results to this JSON file")
+    args = parser.parse_args()
+    
+    unknown = [name for name in args.benchmarks if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(unknown)}")
+    
+    if args.save_corpus:
+        logging.basicConfig(level=logging.INFO, format='%(levelname)s %(message)s')
+        first, _, last = args.save_corpus.partition('-')
+        versions = [str(version) for version in range(int(first), int(last or first) + 1)]
+        print(f"Saved {save_corpus(versions, args.corpus, os.environ.get('TRINO_RELEASE_URL'))} of {len(versions)} pages to {args.corpus}")
+        sys.exit()
+    
+    corpus_dir = args.corpus
+    if corpus_dir == DEFAULT_CORPUS and not load_pages(corpus_dir):
+        print(f"No saved pages in {corpus_dir}, measuring the generated pages instead", file=sys.stderr)
+        corpus_dir = GENERATED_CORPUS
+    corpus = load_corpus(corpus_dir)
+    results = {name: BENCHMARKS[name](corpus, repeat=args.repeat) for name in args.benchmarks or BENCHMARKS}
+    output = json.dumps({
+        'created': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()),
+        'corpus': 'generated' if corpus_dir == GENERATED_CORPUS else 'saved',
+        'corpus_pages': len(corpus),
+        'repeat': args.repeat,
+        'results': results
+    }, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
@@ -0,0 +1,41 @@
+import gzip
+import json
+
+# orjson is optional; it produces the same JSON several times faster
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Compressing smaller payloads costs more than it saves on the wire
+GZIP_MIN_SIZE = 1024
+# Stored payloads are compressed once and kept for weeks, so they get a higher
+# level than responses, which are compressed while the client waits
+STORED_GZIP_LEVEL = 6
+RESPONSE_GZIP_LEVEL = 1
+
+def dumps(data):
+    """Encode data as compact UTF-8 JSON bytes"""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+def loads(data):
+    """Decode JSON bytes or text"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def compress(data, level=STORED_GZIP_LEVEL):
+    """gzip bytes, reproducibly, in a form that can be sent as Content-Encoding: gzip"""
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def decompress(data):
+    return gzip.decompress(data)
+
+def pack(data):
+    """Encode data to the compressed JSON stored in cache tables"""
+    return compress(dumps(data))
+
+def unpack(blob):
+    return loads(decompress(blob))
@@ -29,7 +29,78 @@ def create_app():
         "pool_pre_ping": True,
     }
     
+    # Release notes are stored per release, so caching whole comparisons is optional
+    app.config["COMPARISON_CACHE_ENABLED"] = os.environ.get("COMPARISON_CACHE_ENABLED", "true").lower() == "true"
+    # Limits of the comparison cache table; least recently used entries beyond them
+    # are swept on write, at most every COMPARISON_CACHE_SWEEP_INTERVAL seconds
+    app.config["COMPARISON_CACHE_TTL_DAYS"] = int(os.environ.get("COMPARISON_CACHE_TTL_DAYS", "30"))
+    app.config["COMPARISON_CACHE_MAX_ENTRIES"] = int(os.environ.get("COMPARISON_CACHE_MAX_ENTRIES", "1000"))
+    app.config["COMPARISON_CACHE_MAX_BYTES"] = int(os.environ.get("COMPARISON_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    app.config["COMPARISON_CACHE_SWEEP_INTERVAL"] = int(os.environ.get("COMPARISON_CACHE_SWEEP_INTERVAL", "300"))
+    
+    # Release notes scraping
+    app.config["TRINO_RELEASE_URL"] = os.environ.get(
+        "TRINO_RELEASE_URL", "https://trino.io/docs/current/release/release-{version}.html"
+    )
+    app.config["TRINO_RELEASE_INDEX_URL"] = os.environ.get(
+        "TRINO_RELEASE_INDEX_URL", "https://trino.io/docs/current/release.html"
+    )
+    app.config["SCRAPER_MAX_WORKERS"] = int(os.environ.get("SCRAPER_MAX_WORKERS", "8"))
+    app.config["SCRAPER_TIMEOUT"] = int(os.environ.get("SCRAPER_TIMEOUT", "10"))
+    # Fetching the pages of one request or ingest batch gives up after SCRAPER_DEADLINE
+    # seconds; failed pages are retried with jittered backoff, and a page still
+    # loading after SCRAPER_HEDGE_AFTER seconds is requested a second time (0 disables)
+    app.config["SCRAPER_DEADLINE"] = int(os.environ.get("SCRAPER_DEADLINE", "30"))
+    app.config["SCRAPER_RETRIES"] = int(os.environ.get("SCRAPER_RETRIES", "2"))
+    app.config["SCRAPER_BACKOFF"] = float(os.environ.get("SCRAPER_BACKOFF", "0.5"))
+    app.config["SCRAPER_HEDGE_AFTER"] = float(os.environ.get("SCRAPER_HEDGE_AFTER", "2"))
+    # After SCRAPER_BREAKER_THRESHOLD failures in a row fetching pauses for SCRAPER_BREAKER_RESET seconds
+    app.config["SCRAPER_BREAKER_THRESHOLD"] = int(os.environ.get("SCRAPER_BREAKER_THRESHOLD", "5"))
+    app.config["SCRAPER_BREAKER_RESET"] = int(os.environ.get("SCRAPER_BREAKER_RESET", "30"))
+    # Processes parsing release pages during ingest and reparse; 0 means one per CPU
+    app.config["PARSE_WORKERS"] = int(os.environ.get("PARSE_WORKERS", "0"))
+    app.config["RELEASE_REVALIDATE_DAYS"] = int(os.environ.get("RELEASE_REVALIDATE_DAYS", "30"))
+    # Set to false when releases are ingested offline so compare requests never scrape
+    app.config["SCRAPE_ON_DEMAND"] = os.environ.get("SCRAPE_ON_DEMAND", "true").lower() == "true"
+    
+    # Directory for the lock files that serialize identical comparisons across
+    # processes when the database has no advisory locks (e.g. SQLite)
+    app.config["LOCK_DIR"] = os.environ.get("LOCK_DIR")
+    
+    # HTTP caching of compare responses
+    app.config["COMPARE_CACHE_MAX_AGE"] = int(os.environ.get("COMPARE_CACHE_MAX_AGE", "300"))
+    app.config["COMPARE_LRU_SIZE"] = int(os.environ.get("COMPARE_LRU_SIZE", "128"))
+    app.config["COMPARE_LRU_TTL"] = int(os.environ.get("COMPARE_LRU_TTL", "300"))
+    app.config["COMPARE_OBJECT_LRU_SIZE"] = int(os.environ.get("COMPARE_OBJECT_LRU_SIZE", "16"))
+    
+    # Asynchronous comparison jobs
+    app.config["COMPARE_JOB_WORKERS"] = int(os.environ.get("COMPARE_JOB_WORKERS", "2"))
+    app.config["COMPARE_JOB_MAX_PENDING"] = int(os.environ.get("COMPARE_JOB_MAX_PENDING", "20"))
+    app.config["COMPARE_JOB_TTL"] = int(os.environ.get("COMPARE_JOB_TTL", "600"))
+    
+    # Bearer token required by the /api/admin endpoints; they are open when unset
+    app.config["ADMIN_TOKEN"] = os.environ.get("ADMIN_TOKEN", "")
+    
+    # Requests slower than this are logged with their per-stage timings (0 disables)
+    app.config["SLOW_REQUEST_MS"] = int(os.environ.get("SLOW_REQUEST_MS", "2000"))
+    
+    # Serve every API from a read-only snapshot file (see snapshot.py) instead of
+    # a database server. Nothing is scraped or cached in the database in this mode.
+    app.config["SNAPSHOT_PATH"] = os.environ.get("SNAPSHOT_PATH", "")
+    app.config["READ_ONLY"] = bool(app.config["SNAPSHOT_PATH"])
+    if app.config["READ_ONLY"]:
+        from snapshot import snapshot_database_uri
+        app.config["SQLALCHEMY_DATABASE_URI"] = snapshot_database_uri(app.config["SNAPSHOT_PATH"])
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {}
+        app.config["SCRAPE_ON_DEMAND"] = False
+        app.config["COMPARISON_CACHE_ENABLED"] = False
+    
     # Initialize the database with the app
     db.init_app(app)
     
+    if app.config["READ_ONLY"]:
+        from snapshot import open_snapshot
+        with app.app_context():
+            app.config["SNAPSHOT_INFO"] = open_snapshot(db.engine, app.config["SNAPSHOT_PATH"])
+    
     return app
\ No newline at end of file
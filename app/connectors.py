@@ -0,0 +1,207 @@
+import hashlib
+import re
+import threading
+from functools import lru_cache
+from config import logger
+from models import hash_description, version_to_number
+
+# Known Trino connectors as (match key, display name), in match priority order.
+# Keys also match with spaces removed, e.g. "deltalake".
+KNOWN_CONNECTORS = [
+    ('bigquery', 'BigQuery'), ('clickhouse', 'ClickHouse'), ('delta lake', 'Delta Lake'),
+    ('elasticsearch', 'Elasticsearch'), ('hive', 'Hive'), ('iceberg', 'Iceberg'),
+    ('jdbc', 'Jdbc'), ('kafka', 'Kafka'), ('mongodb', 'Mongodb'), ('mysql', 'Mysql'),
+    ('oracle', 'Oracle'), ('postgresql', 'Postgresql'), ('redis', 'Redis'),
+    ('redshift', 'Redshift'), ('sqlserver', 'SQL Server'), ('snowflake', 'Snowflake'),
+    ('phoenix', 'Phoenix'), ('pinot', 'Pinot'), ('mariadb', 'Mariadb'),
+    ('cassandra', 'Cassandra'), ('accumulo', 'Accumulo'), ('druid', 'Druid'),
+    ('kudu', 'Kudu'), ('memory', 'Memory'), ('thrift', 'Thrift')
+]
+
+def _trie_pattern(words):
+    """Build a regex alternation factored into a prefix trie
+    
+    The regex engine then tries a single branch per character instead of every
+    word, and a word is never shadowed by a shorter word that is its prefix.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = True
+    
+    def build(node):
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ''
+        pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        if '' in node:
+            pattern = '(?:' + pattern + ')?'
+        return pattern
+    
+    return build(trie)
+
+class ConnectorClassifier:
+    """Identify the connector a change description refers to
+    
+    All connector names are matched by one compiled regex over a prefix trie of the
+    names, and the highest priority connector found wins, which gives the same answer as checking
+    the connectors one by one. Results are memoized per text.
+    """
+    
+    def __init__(self, connectors, cache_size=65536):
+        self._lock = threading.Lock()
+        self._connectors = list(connectors)
+        self._keys = {key for key, _ in self._connectors}
+        self._known_count = len(self._connectors)
+        self._cache_size = cache_size
+        self._compile()
+    
+    def _compile(self):
+        variants = []
+        priorities = {}
+        for priority, (key, _) in enumerate(self._connectors):
+            key_variants = [key] if ' ' not in key else [key, key.replace(' ', '')]
+            variants.append(key_variants)
+            for variant in key_variants:
+                priorities.setdefault(variant, priority)
+        
+        # Swapped in as one value so a concurrent lookup never mixes two registries
+        self._compiled = (re.compile(_trie_pattern(priorities)), priorities, variants,
+                          [name for _, name in self._connectors])
+        # Identifies the registry, so cached results can tell when classification changed
+        self.fingerprint = hashlib.sha1(
+            '|'.join(f"{key}={name}" for key, name in self._connectors).encode('utf-8')
+        ).hexdigest()[:12]
+        self.classify = lru_cache(maxsize=self._cache_size)(self._classify)
+    
+    def _classify(self, text):
+        pattern, priorities, variants, display_names = self._compiled
+        text_lower = text.lower()
+        
+        best = None
+        for match in pattern.finditer(text_lower):
+            priority = priorities[match.group()]
+            if best is None or priority < best:
+                best = priority
+        
+        if best is not None:
+            # Matches don't overlap, so a higher priority name may hide inside
+            # one that was found; those few are checked directly
+            for priority in range(best):
+                if any(variant in text_lower for variant in variants[priority]):
+                    best = priority
+                    break
+            return display_names[best]
+        
+        # Check for connector format like "X connector" or "X Connector"
+        connector_match = text_lower.split(' connector')[0].split()
+        if connector_match and len(connector_match) > 0:
+            last_word = connector_match[-1]
+            if len(last_word) > 2 and any(c.isalpha() for c in last_word):
+                return last_word.capitalize()
+        
+        # If no specific connector is identified, categorize as General
+        return 'General'
+    
+    def registered_names(self):
+        """Names of the connectors added from section headings, in the order they were added"""
+        with self._lock:
+            return [name for _, name in self._connectors[self._known_count:]]
+    
+    @staticmethod
+    def _heading_connector(name):
+        """(key, name) of a connector named by a section heading, or None if the heading names none"""
+        name = ' '.join(name.split())
+        key = name.lower()
+        if len(key) <= 2 or len(name) > 50 or len(key.split()) > 3 or not any(c.isalpha() for c in key) or key == 'general':
+            return None
+        return key, name
+    
+    def reset(self, names):
+        """Replace the registered connectors with names, in order, returning True if the registry changed"""
+        connectors = self._connectors[:self._known_count]
+        keys = {key for key, _ in connectors}
+        for name in names:
+            connector = self._heading_connector(name)
+            if connector is None or connector[0] in keys or connector[0].replace(' ', '') in keys:
+                continue
+            connectors.append(connector)
+            keys.add(connector[0])
+        
+        with self._lock:
+            if connectors == self._connectors:
+                return False
+            self._connectors = connectors
+            self._keys = keys
+            self._compile()
+        return True
+    
+    def register(self, name):
+        """Add a connector found in a release notes section heading, returning True if it is new"""
+        connector = self._heading_connector(name)
+        if connector is None:
+            return False
+        key, name = connector
+        if key in self._keys or key.replace(' ', '') in self._keys:
+            return False
+        
+        with self._lock:
+            if key in self._keys:
+                return False
+            # New connectors go last so they never take priority over the known ones
+            self._connectors.append((key, name))
+            self._keys.add(key)
+            self._compile()
+        return True
+
+connector_classifier = ConnectorClassifier(KNOWN_CONNECTORS)
+
+def identify_connector(text):
+    """Try to extract connector name from text"""
+    return connector_classifier.classify(text)
+
+def register_connector(name):
+    """Pick up a connector named by a connector section heading of the release notes"""
+    if connector_classifier.register(name):
+        logger.info(f"Registered new connector from release notes: {name}")
+
+def register_connectors(release):
+    """Pick up the connectors named by the section headings of a parsed release"""
+    for connector in release.get('connectors', []):
+        register_connector(connector['connector'])
+
+def classify_release(version, release):
+    """Turn the parsed release notes of one version into ConnectorChange rows"""
+    register_connectors(release)
+    records = []
+    
+    for item in release.get('breaking_changes', []):
+        records.append({
+            'connector_name': identify_connector(item),
+            'version': version,
+            'version_number': version_to_number(version),
+            'change_type': 'breaking',
+            'description': item,
+            'description_hash': hash_description(item),
+            'impact': 'high'  # Default impact for breaking changes
+        })
+    
+    # Connector sections are reported as new features, like in build_changes
+    feature_items = list(release.get('new_features', []))
+    for connector in release.get('connectors', []):
+        feature_items.extend(connector['items'])
+    
+    for item in feature_items:
+        records.append({
+            'connector_name': identify_connector(item),
+            'version': version,
+            'version_number': version_to_number(version),
+            'change_type': 'feature',
+            'description': item,
+            'description_hash': hash_description(item),
+            'impact': 'medium'  # Default impact for features
+        })
+    
+    return records
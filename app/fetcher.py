@@ -0,0 +1,234 @@
+import random
+import re
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+import requests
+from requests.adapters import HTTPAdapter
+from config import logger
+from metrics import RELEASE_FETCHES, RELEASE_FETCH_HEDGES, timed, with_stage_times
+
+DEFAULT_RELEASE_URL = "https://trino.io/docs/current/release/release-{version}.html"
+DEFAULT_RELEASE_INDEX_URL = "https://trino.io/docs/current/release.html"
+
+# Outcome of fetching one release page; html is None when the page was not modified (304)
+# or is not published (404)
+FetchResult = namedtuple('FetchResult', ['url', 'status_code', 'html', 'etag', 'last_modified'])
+
+_session = None
+_session_pool_size = 0
+_session_lock = threading.Lock()
+
+# Connections kept per host: the default SCRAPER_MAX_WORKERS, each with a hedged request
+DEFAULT_POOL_SIZE = 16
+
+def get_session(pool_size=DEFAULT_POOL_SIZE):
+    """Get the process-wide keep-alive session used for fetching release pages, with at least pool_size connections"""
+    global _session, _session_pool_size
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+        # The pool only grows, so a small first batch cannot shrink it for later ones
+        if pool_size > _session_pool_size:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+            _session_pool_size = pool_size
+        return _session
+
+# Responses worth retrying; anything else is a final answer from upstream
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+class CircuitBreaker:
+    """Fail fast for reset_timeout seconds after failure_threshold failed fetches in a row, then let one trial through"""
+    
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._open_until = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+    
+    @property
+    def state(self):
+        with self._lock:
+            if self._open_until is None:
+                return 'closed'
+            return 'open' if time.monotonic() < self._open_until else 'half-open'
+    
+    def allow(self):
+        with self._lock:
+            if self._open_until is None:
+                return True
+            if time.monotonic() < self._open_until or self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+    
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._open_until = None
+            self._trial_running = False
+    
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._trial_running or self._failures >= self.failure_threshold:
+                if self._open_until is None or self._trial_running:
+                    logger.warning(f"Release site failing, pausing fetches for {self.reset_timeout}s")
+                self._open_until = time.monotonic() + self.reset_timeout
+                self._trial_running = False
+
+_breaker = None
+_hedge_executor = None
+
+def get_breaker(failure_threshold=5, reset_timeout=30):
+    """Get the process-wide circuit breaker for the release site"""
+    global _breaker
+    with _session_lock:
+        if _breaker is None:
+            _breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        return _breaker
+
+def _get_hedge_executor():
+    global _hedge_executor
+    with _session_lock:
+        if _hedge_executor is None:
+            _hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix='release-hedge')
+        return _hedge_executor
+
+def _get(session, url, headers, timeout, hedge_after=None):
+    """GET url, racing a second identical request against it if it takes longer than hedge_after seconds"""
+    def get(timeout):
+        with timed('fetch'):
+            return session.get(url, headers=headers, timeout=timeout)
+    
+    if not hedge_after or hedge_after >= timeout:
+        return get(timeout)
+    
+    executor = _get_hedge_executor()
+    first = executor.submit(with_stage_times(get), timeout)
+    done, _ = wait([first], timeout=hedge_after)
+    if done:
+        return first.result()
+    
+    # The second request only gets the time the first one has left
+    RELEASE_FETCH_HEDGES.inc()
+    pending = {first, executor.submit(with_stage_times(get), timeout - hedge_after)}
+    error = None
+    while pending:
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            if future.exception() is None:
+                # The slower request is left to finish or time out on its own
+                return future.result()
+            error = future.exception()
+    raise error
+
+def fetch_release_page(version, release_url=DEFAULT_RELEASE_URL, timeout=10, session=None, etag=None, last_modified=None,
+                       retries=0, backoff=0.5, hedge_after=None, deadline=None, breaker=None):
+    """Download the release notes page for a single Trino version, returning None on failure"""
+    # 304 and 404 (not published yet) come back as a FetchResult without HTML;
+    # deadline is a time.monotonic() value
+    url = release_url.format(version=version)
+    headers = {}
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    session = session or get_session()
+    
+    for attempt in range(retries + 1):
+        attempt_timeout = timeout
+        if deadline is not None:
+            attempt_timeout = min(timeout, deadline - time.monotonic())
+            if attempt_timeout <= 0:
+                RELEASE_FETCHES.inc(status='deadline')
+                logger.warning(f"Deadline exceeded before fetching version {version}")
+                return None
+        
+        # Checked last: in the half-open state allow() claims the one trial
+        # request, which must then be recorded as a success or failure
+        if breaker is not None and not breaker.allow():
+            RELEASE_FETCHES.inc(status='circuit_open')
+            logger.warning(f"Not fetching version {version}: release site is failing")
+            return None
+        
+        logger.info(f"Fetching release notes from {url}{' (revalidating)' if headers else ''}"
+                    f"{f' (retry {attempt})' if attempt else ''}")
+        try:
+            response = _get(session, url, headers, attempt_timeout, hedge_after)
+        except requests.RequestException as e:
+            RELEASE_FETCHES.inc(status='error')
+            logger.error(f"Error fetching version {version}: {str(e)}")
+            response = None
+        else:
+            RELEASE_FETCHES.inc(status=response.status_code)
+        
+        if response is not None and response.status_code not in RETRYABLE_STATUS_CODES:
+            if breaker is not None:
+                breaker.record_success()
+            if response.status_code == 304 and headers:
+                return FetchResult(url, 304, None, response.headers.get('ETag', etag), response.headers.get('Last-Modified', last_modified))
+            if response.status_code == 404:
+                logger.info(f"Release notes for version {version} are not published")
+                return FetchResult(url, 404, None, None, None)
+            if response.status_code != 200:
+                logger.warning(f"Failed to fetch release notes for version {version}, status code: {response.status_code}")
+                return None
+            return FetchResult(url, 200, response.text, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+        
+        if response is not None:
+            logger.warning(f"Failed to fetch release notes for version {version}, status code: {response.status_code}")
+        if breaker is not None:
+            breaker.record_failure()
+        if attempt < retries:
+            # Full jitter keeps retries of many pages from arriving in lockstep
+            delay = random.uniform(0, backoff * 2 ** attempt)
+            if deadline is not None:
+                delay = min(delay, max(deadline - time.monotonic(), 0))
+            time.sleep(delay)
+    
+    logger.warning(f"Giving up on version {version} after {retries + 1} attempts")
+    return None
+
+def fetch_release_pages(versions, release_url=DEFAULT_RELEASE_URL, max_workers=8, timeout=10, validators=None,
+                        retries=0, backoff=0.5, hedge_after=None, deadline=None, breaker=None):
+    """Fetch release notes pages with bounded concurrency, yielding (version, FetchResult) in version order"""
+    # validators maps a version to its stored (etag, last_modified); deadline is
+    # in seconds for the whole batch, and versions not fetched in time yield None
+    versions = list(versions)
+    if not versions:
+        return
+    
+    validators = validators or {}
+    # Sized by the configured workers, each with a hedged request, not by this batch
+    session = get_session(2 * max(max_workers, 1))
+    max_workers = max(1, min(max_workers, len(versions)))
+    deadline_at = time.monotonic() + deadline if deadline else None
+    
+    def fetch(version):
+        etag, last_modified = validators.get(version, (None, None))
+        return fetch_release_page(version, release_url, timeout, session, etag, last_modified,
+                                  retries=retries, backoff=backoff, hedge_after=hedge_after,
+                                  deadline=deadline_at, breaker=breaker)
+    
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='release-fetch') as executor:
+        # executor.map hands results back in submission order, so callers can
+        # process each release as soon as it and all earlier ones are done
+        for version, result in zip(versions, executor.map(with_stage_times(fetch), versions)):
+            yield version, result
+
+def fetch_release_versions(index_url=DEFAULT_RELEASE_INDEX_URL, timeout=10):
+    """Discover the published Trino release numbers from the release notes index page"""
+    logger.info(f"Fetching release index from {index_url}")
+    
+    response = get_session().get(index_url, timeout=timeout)
+    response.raise_for_status()
+    
+    # Links look like "release/release-474.html"; pre-Trino "0.x" releases are ignored
+    versions = {int(version) for version in re.findall(r'release-(\d+)\.html', response.text)}
+    return [str(version) for version in sorted(versions)]
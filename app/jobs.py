@@ -0,0 +1,122 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from config import logger
+
+class JobQueueFull(Exception):
+    """Raised when too many comparison jobs are already queued or running"""
+
+class ComparisonJob:
+    """State and event log of one asynchronous version comparison"""
+    
+    def __init__(self, from_version, to_version, total):
+        self.id = uuid.uuid4().hex
+        self.from_version = from_version
+        self.to_version = to_version
+        self.status = 'queued'
+        self.total = total
+        self.completed = 0
+        self.result = None
+        self.error = None
+        self.created = time.monotonic()
+        self.finished = None
+        # Events are kept so late subscribers and reconnecting clients can replay them
+        self.events = []
+        self._condition = threading.Condition()
+    
+    def emit(self, event, data):
+        """Record an event and wake up everyone streaming this job"""
+        with self._condition:
+            self.events.append((event, data))
+            self._condition.notify_all()
+    
+    def wait_for_events(self, start, timeout):
+        """Return the events after index start, waiting up to timeout seconds for new ones"""
+        with self._condition:
+            if len(self.events) <= start and not self.is_finished():
+                self._condition.wait(timeout)
+            return self.events[start:]
+    
+    def is_finished(self):
+        return self.status in ('done', 'failed')
+    
+    def to_dict(self, include_result=True):
+        data = {
+            'job_id': self.id,
+            'status': self.status,
+            'from_version': self.from_version,
+            'to_version': self.to_version,
+            'completed': self.completed,
+            'total': self.total
+        }
+        if self.error:
+            data['error'] = self.error
+        if include_result and self.status == 'done':
+            data['result'] = self.result
+        return data
+
+class JobManager:
+    """Run comparison jobs on a bounded worker pool and keep their state in this process
+    
+    Jobs live in process memory, so their status and events are only visible to
+    the process that accepted them; the mod_wsgi deployment runs a single daemon
+    process with several threads. Finished jobs are forgotten after job_ttl seconds.
+    """
+    
+    def __init__(self, max_workers=2, max_pending=20, job_ttl=600):
+        self.max_pending = max_pending
+        self.job_ttl = job_ttl
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='compare-job')
+        self._jobs = {}
+        self._active = {}
+        self._lock = threading.Lock()
+    
+    def _expire(self):
+        now = time.monotonic()
+        for job_id, job in list(self._jobs.items()):
+            if job.finished is not None and job.finished + self.job_ttl < now:
+                del self._jobs[job_id]
+    
+    def submit(self, from_version, to_version, total, run):
+        """Start a job for a version range, or return the job already running for it
+        
+        run(job) does the work and returns the result; it may call job.emit()
+        to stream progress. Raises JobQueueFull if the pool is saturated.
+        """
+        with self._lock:
+            self._expire()
+            
+            job = self._active.get((from_version, to_version))
+            if job is not None:
+                return job
+            if len(self._active) >= self.max_pending:
+                raise JobQueueFull(f"{len(self._active)} comparison jobs are already pending")
+            
+            job = ComparisonJob(from_version, to_version, total)
+            self._jobs[job.id] = job
+            self._active[(from_version, to_version)] = job
+        
+        self._executor.submit(self._run, job, run)
+        return job
+    
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+    
+    def _run(self, job, run):
+        job.status = 'running'
+        job.emit('status', {'status': job.status, 'total': job.total})
+        try:
+            job.result = run(job)
+            job.status = 'done'
+            job.emit('done', job.to_dict())
+        except Exception as e:
+            logger.error(f"Comparison job {job.id} failed: {str(e)}")
+            job.error = str(e)
+            job.status = 'failed'
+            job.emit('failed', job.to_dict())
+        finally:
+            job.finished = time.monotonic()
+            with self._lock:
+                self._active.pop((job.from_version, job.to_version), None)
@@ -1,13 +1,21 @@
+import argparse
 from app import app
 from config import db, logger
 
-# Initialize the database when the application starts
+# Create the tables and upgrade the schema; run by the migrate command, not on import,
+# so web processes start without touching the schema
 def init_db():
+    if app.config["READ_ONLY"]:
+        logger.info("Serving a read-only snapshot, skipping database initialization")
+        return
     with app.app_context():
         try:
             db.create_all()
             logger.info("Database tables created")
             
+            from migrations import upgrade_schema
+            upgrade_schema()
+            
             # Import models here to avoid circular imports
             from models import TrinoVersion
             
@@ -18,12 +26,92 @@ def init_db():
                     db.session.add(TrinoVersion(version=version))
                 db.session.commit()
                 logger.info(f"Added initial versions: {common_versions}")
+            return True
         except Exception as e:
             logger.error(f"Error initializing database: {str(e)}")
             db.session.rollback()
+            return False
+
+# Ingest release notes outside the request path, e.g. from cron
+def ingest_releases(revalidate=False):
+    # Import scraper here so web processes that never ingest don't pay for it
+    from scraper import ingest_releases as ingest_new_releases
+    
+    try:
+        ingested = ingest_new_releases(app, db, revalidate=revalidate)
+        logger.info(f"Ingest finished, {len(ingested)} releases stored")
+        return ingested
+    except Exception as e:
+        logger.error(f"Error ingesting releases: {str(e)}")
+        return None
+
+# Parse the stored release pages again after a parser change
+def reparse_releases(workers=None):
+    from scraper import reparse_releases as reparse
+    
+    try:
+        changed = reparse(app, db, workers=workers)
+        logger.info(f"Reparse finished, {len(changed)} releases changed")
+        return changed
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error reparsing releases: {str(e)}")
+        return None
+
+# Sweep the comparison cache outside the request path, e.g. from cron
+def sweep_comparison_cache():
+    from scraper import sweep_comparison_cache as sweep
+    
+    try:
+        deleted = sweep(app, db)
+        logger.info(f"Cache sweep finished, {deleted} comparisons deleted")
+        return deleted
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error sweeping comparison cache: {str(e)}")
+        return None
 
-# Initialize database on import
-init_db()
+# Export the stored releases to a snapshot file for read-only serving
+def export_snapshot(path):
+    from snapshot import export_snapshot as export
+    
+    try:
+        return export(app, db, path)
+    except Exception as e:
+        logger.error(f"Error exporting snapshot: {str(e)}")
+        return None
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Trino breaking changes tracker")
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.add_parser('runserver', help="Run the development server (default)")
+    subparsers.add_parser('migrate', help="Create the database tables and upgrade the schema")
+    ingest_parser = subparsers.add_parser('ingest', help="Scrape and store every published release that is not stored yet")
+    ingest_parser.add_argument('--revalidate', action='store_true',
+                               help="Also revalidate stored pages older than RELEASE_REVALIDATE_DAYS")
+    reparse_parser = subparsers.add_parser('reparse', help="Parse the stored release pages again and store what changed")
+    reparse_parser.add_argument('--workers', type=int, help="Parse processes (default: PARSE_WORKERS, 0 for one per CPU)")
+    subparsers.add_parser('sweep-cache', help="Delete expired and least recently used cached comparisons")
+    export_parser = subparsers.add_parser('export-snapshot', help="Write the stored releases to a read-only snapshot file")
+    export_parser.add_argument('path', help="Snapshot file to write, e.g. trino-releases-474.sqlite")
+    args = parser.parse_args()
+    
+    if args.command in ('migrate', 'ingest', 'reparse', 'sweep-cache', 'export-snapshot') and app.config["READ_ONLY"]:
+        parser.error(f"{args.command} needs the database; unset SNAPSHOT_PATH")
+    if args.command == 'migrate':
+        raise SystemExit(0 if init_db() else 1)
+    if args.command == 'ingest':
+        raise SystemExit(0 if ingest_releases(args.revalidate) is not None else 1)
+    if args.command == 'reparse':
+        # Imported here so web processes importing this module never load multiprocessing
+        from parse_pool import parse_workers
+        workers = None if args.workers is None else parse_workers(args.workers)
+        raise SystemExit(0 if reparse_releases(workers) is not None else 1)
+    if args.command == 'sweep-cache':
+        raise SystemExit(0 if sweep_comparison_cache() is not None else 1)
+    if args.command == 'export-snapshot':
+        raise SystemExit(0 if export_snapshot(args.path) is not None else 1)
+    
+    # The development server migrates on start so a fresh checkout just runs
+    init_db()
     app.run(host='0.0.0.0', port=5000, debug=True)
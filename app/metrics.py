@@ -0,0 +1,184 @@
+import bisect
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+# Minimal Prometheus instrumentation. Metrics are kept per process and rendered
+# in the text exposition format by /metrics.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+REGISTRY = []
+
+def _format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+def _format_value(value):
+    return repr(float(value)) if value != float('inf') else '+Inf'
+
+class Counter:
+    """Monotonic counter, optionally split by labels"""
+    
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+    
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+    
+    def value(self, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with self._lock:
+            return self._values.get(key, 0)
+    
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+class Histogram:
+    """Cumulative histogram of observed values, optionally split by labels"""
+    
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._values = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+    
+    def observe(self, value, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[index] += 1
+            self._values[key] = (counts, total + value)
+    
+    def collect(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            values = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [('le', _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {cumulative}"
+
+def render():
+    """All registered metrics in the Prometheus text exposition format"""
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.collect())
+    return '\n'.join(lines) + '\n'
+
+REQUEST_SECONDS = Histogram(
+    'trino_tracker_request_duration_seconds', 'HTTP request latency', ['endpoint', 'method', 'status']
+)
+STAGE_SECONDS = Histogram(
+    'trino_tracker_stage_duration_seconds', 'Time spent in each stage of building a response', ['stage']
+)
+CACHE_REQUESTS = Counter(
+    'trino_tracker_cache_requests_total', 'Comparison cache lookups by cache and result', ['cache', 'result']
+)
+RELEASE_FETCHES = Counter(
+    'trino_tracker_release_fetches_total',
+    'Release page fetch attempts by HTTP status code, or error, deadline or circuit_open', ['status']
+)
+RELEASE_FETCH_HEDGES = Counter(
+    'trino_tracker_release_fetch_hedges_total', 'Release page requests raced against a second request'
+)
+
+class StageTimes:
+    """Per-request totals of time spent in each stage, for the slow request log"""
+    
+    def __init__(self):
+        self.start = time.perf_counter()
+        self._stages = {}
+        self._lock = threading.Lock()
+    
+    def add(self, stage, seconds):
+        with self._lock:
+            total, count = self._stages.get(stage, (0.0, 0))
+            self._stages[stage] = (total + seconds, count + 1)
+    
+    def elapsed(self):
+        return time.perf_counter() - self.start
+    
+    def breakdown(self):
+        """Stages as "name=12.3ms", with a call count for stages that ran more than once
+        
+        Stages that ran in parallel (fetches) report the sum over all calls, which
+        can exceed the wall-clock time of the request.
+        """
+        with self._lock:
+            stages = list(self._stages.items())
+        parts = []
+        for stage, (total, count) in stages:
+            part = f"{stage}={total * 1000:.1f}ms"
+            if count > 1:
+                part += f"/{count}"
+            parts.append(part)
+        return ' '.join(parts) or 'no stages recorded'
+
+_stage_times = contextvars.ContextVar('stage_times', default=None)
+
+def start_request():
+    """Start collecting stage times for the current request"""
+    stage_times = StageTimes()
+    _stage_times.set(stage_times)
+    return stage_times
+
+def finish_request():
+    """Stop collecting stage times, returning what was collected for the request"""
+    stage_times = _stage_times.get()
+    _stage_times.set(None)
+    return stage_times
+
+def with_stage_times(fn):
+    """Wrap fn so that stages it times on another thread count toward the current request"""
+    stage_times = _stage_times.get()
+    
+    def wrapper(*args, **kwargs):
+        token = _stage_times.set(stage_times)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _stage_times.reset(token)
+    
+    return wrapper
+
+@contextmanager
+def timed(stage):
+    """Time a block as one run of stage, in the stage histogram and the current request"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        seconds = time.perf_counter() - start
+        STAGE_SECONDS.observe(seconds, stage=stage)
+        stage_times = _stage_times.get()
+        if stage_times is not None:
+            stage_times.add(stage, seconds)
@@ -0,0 +1,227 @@
+import json
+from sqlalchemy import bindparam, inspect, text
+from config import db, logger
+
+# db.create_all() only creates missing tables. Columns and indexes added to
+# existing tables by later versions of the app are applied by these steps,
+# each of which checks whether it is still needed.
+
+def _column_names(inspector, table):
+    return {column['name'] for column in inspector.get_columns(table)}
+
+def add_connector_change_hashes(inspector):
+    """Add description_hash and the unique index to connector_change, dropping duplicate rows"""
+    from models import ConnectorChange, hash_description
+    from connectors import classify_release
+    
+    if 'connector_change' not in inspector.get_table_names():
+        return False
+    if 'description_hash' in _column_names(inspector, 'connector_change'):
+        return False
+    
+    logger.info("Adding description_hash to connector_change")
+    db.session.execute(text("ALTER TABLE connector_change ADD COLUMN description_hash VARCHAR(40)"))
+    
+    rows = db.session.execute(text("SELECT id, description FROM connector_change")).all()
+    updates = [{'id': row.id, 'description_hash': hash_description(row.description)} for row in rows]
+    for i in range(0, len(updates), 1000):
+        db.session.execute(
+            text("UPDATE connector_change SET description_hash = :description_hash WHERE id = :id"),
+            updates[i:i + 1000]
+        )
+    
+    db.session.execute(text(
+        "DELETE FROM connector_change WHERE id NOT IN ("
+        "SELECT MIN(id) FROM connector_change "
+        "GROUP BY connector_name, version, change_type, description_hash)"
+    ))
+    db.session.execute(text(
+        "CREATE UNIQUE INDEX unique_connector_change "
+        "ON connector_change (connector_name, version, change_type, description_hash)"
+    ))
+    
+    # Connector changes are now written when a release is stored, so fill in
+    # the rows of releases stored before that
+    for version, release_data in db.session.execute(text("SELECT version, release_data FROM release_note")).all():
+        ConnectorChange.insert_many(classify_release(version, json.loads(release_data)))
+    
+    return True
+
+def add_version_numbers(inspector):
+    """Add the indexed integer version_number column to the versioned tables"""
+    from models import version_to_number
+    
+    applied = False
+    for table in ('trino_version', 'release_note', 'connector_change'):
+        if table not in inspector.get_table_names() or 'version_number' in _column_names(inspector, table):
+            continue
+        
+        logger.info(f"Adding version_number to {table}")
+        db.session.execute(text(f"ALTER TABLE {table} ADD COLUMN version_number INTEGER"))
+        versions = [row[0] for row in db.session.execute(text(f"SELECT DISTINCT version FROM {table}")).all()]
+        updates = [
+            {'version': version, 'version_number': version_to_number(version)}
+            for version in versions if version_to_number(version) is not None
+        ]
+        if updates:
+            db.session.execute(
+                text(f"UPDATE {table} SET version_number = :version_number WHERE version = :version"),
+                updates
+            )
+        db.session.execute(text(f"CREATE INDEX ix_{table}_version_number ON {table} (version_number)"))
+        if table == 'connector_change':
+            db.session.execute(text(
+                "CREATE INDEX ix_connector_change_connector_version "
+                "ON connector_change (connector_name, version_number)"
+            ))
+        applied = True
+    
+    return applied
+
+def add_release_content_hashes(inspector):
+    """Add content_hash to release_note, used to build comparison ETags"""
+    from models import ReleaseNote
+    
+    if 'release_note' not in inspector.get_table_names():
+        return False
+    if 'content_hash' in _column_names(inspector, 'release_note'):
+        return False
+    
+    logger.info("Adding content_hash to release_note")
+    db.session.execute(text("ALTER TABLE release_note ADD COLUMN content_hash VARCHAR(40)"))
+    updates = []
+    for release_id, release_data in db.session.execute(text("SELECT id, release_data FROM release_note")).all():
+        release_note = ReleaseNote(release_data=release_data)
+        release_note.set_release_data(release_note.get_release_data())
+        updates.append({'id': release_id, 'release_data': release_note.release_data, 'content_hash': release_note.content_hash})
+    if updates:
+        db.session.execute(
+            text("UPDATE release_note SET release_data = :release_data, content_hash = :content_hash WHERE id = :id"),
+            updates
+        )
+    
+    return True
+
+def add_search_index(inspector):
+    """Create the full-text index over connector_change descriptions used by /api/search"""
+    from search import SEARCH_CONFIG, FTS_TABLE, SQLITE_FTS_DDL
+    
+    if 'connector_change' not in inspector.get_table_names():
+        return False
+    
+    dialect = db.engine.dialect.name
+    if dialect == 'postgresql':
+        index_names = {index['name'] for index in inspector.get_indexes('connector_change')}
+        if 'ix_connector_change_search' in index_names:
+            return False
+        logger.info("Creating full-text search index on connector_change")
+        db.session.execute(text(
+            "CREATE INDEX ix_connector_change_search ON connector_change "
+            f"USING GIN (to_tsvector('{SEARCH_CONFIG}', description))"
+        ))
+        return True
+    
+    if dialect == 'sqlite':
+        if FTS_TABLE in inspector.get_table_names():
+            return False
+        logger.info(f"Creating full-text search table {FTS_TABLE}")
+        # The triggers keep the index in step with every insert, update and delete
+        db.session.execute(text(SQLITE_FTS_DDL))
+        db.session.execute(text(
+            f"CREATE TRIGGER connector_change_fts_insert AFTER INSERT ON connector_change BEGIN "
+            f"INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description); END"
+        ))
+        db.session.execute(text(
+            f"CREATE TRIGGER connector_change_fts_delete AFTER DELETE ON connector_change BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description); END"
+        ))
+        db.session.execute(text(
+            f"CREATE TRIGGER connector_change_fts_update AFTER UPDATE OF description ON connector_change BEGIN "
+            f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, description) VALUES ('delete', old.id, old.description); "
+            f"INSERT INTO {FTS_TABLE}(rowid, description) VALUES (new.id, new.description); END"
+        ))
+        db.session.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+        return True
+    
+    # Other databases are searched without an index
+    return False
+
+def compress_comparison_data(inspector):
+    """Add comparison_blob to version_comparison and move cached comparisons into it compressed"""
+    from codec import pack
+    
+    if 'version_comparison' not in inspector.get_table_names():
+        return False
+    if 'comparison_blob' in _column_names(inspector, 'version_comparison'):
+        return False
+    
+    logger.info("Adding comparison_blob to version_comparison")
+    blob_type = 'BYTEA' if db.engine.dialect.name == 'postgresql' else 'BLOB'
+    db.session.execute(text(f"ALTER TABLE version_comparison ADD COLUMN comparison_blob {blob_type}"))
+    
+    ids = [row[0] for row in db.session.execute(text(
+        "SELECT id FROM version_comparison WHERE comparison_data IS NOT NULL"
+    )).all()]
+    # Comparisons can be large, so only a batch of them is decoded at a time
+    for i in range(0, len(ids), 100):
+        rows = db.session.execute(
+            text("SELECT id, comparison_data FROM version_comparison WHERE id IN :ids").bindparams(
+                bindparam('ids', expanding=True)
+            ),
+            {'ids': ids[i:i + 100]}
+        ).all()
+        updates = []
+        for row in rows:
+            try:
+                blob = pack(json.loads(row.comparison_data))
+            except ValueError:
+                # Unreadable entries are dropped and rebuilt on their next request
+                blob = None
+            updates.append({'id': row.id, 'blob': blob})
+        db.session.execute(
+            text("UPDATE version_comparison SET comparison_blob = :blob, comparison_data = NULL WHERE id = :id"),
+            updates
+        )
+    
+    return True
+
+def add_comparison_access_stats(inspector):
+    """Add last_access and hit_count to version_comparison for the cache sweeper"""
+    if 'version_comparison' not in inspector.get_table_names():
+        return False
+    if 'last_access' in _column_names(inspector, 'version_comparison'):
+        return False
+    
+    logger.info("Adding last_access and hit_count to version_comparison")
+    timestamp_type = 'TIMESTAMP' if db.engine.dialect.name == 'postgresql' else 'DATETIME'
+    db.session.execute(text(f"ALTER TABLE version_comparison ADD COLUMN last_access {timestamp_type}"))
+    db.session.execute(text("ALTER TABLE version_comparison ADD COLUMN hit_count INTEGER NOT NULL DEFAULT 0"))
+    db.session.execute(text("UPDATE version_comparison SET last_access = create_date"))
+    db.session.execute(text(
+        "CREATE INDEX ix_version_comparison_last_access ON version_comparison (last_access)"
+    ))
+    
+    return True
+
+# Steps run in this order. They use plain SQL on the tables they touch, since
+# the models describe the latest schema rather than the one being upgraded.
+UPGRADE_STEPS = [
+    add_version_numbers,
+    add_connector_change_hashes,
+    add_release_content_hashes,
+    add_search_index,
+    compress_comparison_data,
+    add_comparison_access_stats,
+]
+
+def upgrade_schema():
+    """Apply the schema changes that db.create_all() cannot make to existing tables"""
+    for step in UPGRADE_STEPS:
+        try:
+            if step(inspect(db.engine)):
+                db.session.commit()
+                logger.info(f"Applied schema upgrade: {step.__name__}")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error applying schema upgrade {step.__name__}: {str(e)}")
+            raise
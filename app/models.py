@@ -1,12 +1,30 @@
 from datetime import datetime, timedelta
+import hashlib
 import json
+import zlib
+from sqlalchemy import insert
+from sqlalchemy.dialects import postgresql, sqlite
 from config import db
+from codec import pack, unpack
+
+def hash_description(description):
+    """Hash a change description so it can be part of a compact unique index"""
+    return hashlib.sha1(description.encode('utf-8')).hexdigest()
+
+def version_to_number(version):
+    """Convert a Trino version string to the integer used for range queries, or None"""
+    version = str(version).strip()
+    return int(version) if version.isdigit() else None
+
+def _version_number_default(context):
+    return version_to_number(context.get_current_parameters()['version'])
 
 # Define database models
 class TrinoVersion(db.Model):
     """Model for tracking available Trino versions"""
     id = db.Column(db.Integer, primary_key=True)
     version = db.Column(db.String(20), unique=True, nullable=False)
+    version_number = db.Column(db.Integer, index=True, default=_version_number_default)
     create_date = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
@@ -17,9 +35,12 @@ class VersionComparison(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     from_version = db.Column(db.String(20), nullable=False)
     to_version = db.Column(db.String(20), nullable=False)
-    comparison_data = db.Column(db.Text, nullable=True)
+    comparison_data = db.Column(db.Text, nullable=True)  # Legacy plain JSON, see comparison_blob
+    comparison_blob = db.Column(db.LargeBinary, nullable=True)  # gzip-compressed JSON
     create_date = db.Column(db.DateTime, default=datetime.utcnow)
     expire_date = db.Column(db.DateTime, default=lambda: datetime.utcnow() + timedelta(days=30))
+    last_access = db.Column(db.DateTime, index=True, default=datetime.utcnow)
+    hit_count = db.Column(db.Integer, nullable=False, default=0)
     
     __table_args__ = (
         db.UniqueConstraint('from_version', 'to_version', name='unique_version_comparison'),
@@ -32,21 +53,149 @@ class VersionComparison(db.Model):
         """Check if the cached comparison is still valid"""
         return self.expire_date > datetime.utcnow()
     
+    @classmethod
+    def size_expression(cls):
+        """SQL expression for the stored size of an entry in bytes"""
+        return db.func.coalesce(db.func.length(cls.comparison_blob), 0) + \
+            db.func.coalesce(db.func.length(cls.comparison_data), 0)
+    
+    def record_hit(self):
+        """Count a cache hit and refresh last_access, atomically so concurrent hits all count"""
+        VersionComparison.query.filter_by(id=self.id).update({
+            'hit_count': VersionComparison.hit_count + 1,
+            'last_access': datetime.utcnow()
+        }, synchronize_session=False)
+        db.session.commit()
+    
+    def has_comparison_data(self):
+        return bool(self.comparison_blob or self.comparison_data)
+    
     def get_comparison_data(self):
         """Get the comparison data as a Python dictionary"""
+        if self.comparison_blob:
+            return unpack(self.comparison_blob)
         if self.comparison_data:
             return json.loads(self.comparison_data)
         return {}
+    
+    def set_comparison_data(self, data):
+        """Store the comparison data compressed"""
+        self.comparison_blob = pack(data)
+        self.comparison_data = None
+
+class ReleaseNote(db.Model):
+    """Model for storing the parsed release notes of a single Trino release"""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.String(20), unique=True, nullable=False)
+    version_number = db.Column(db.Integer, index=True, default=_version_number_default)
+    release_data = db.Column(db.Text, nullable=False)
+    content_hash = db.Column(db.String(40), nullable=True)
+    create_date = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ReleaseNote {self.version}>"
+    
+    def get_release_data(self):
+        """Get the parsed release notes as a Python dictionary"""
+        if self.release_data:
+            return json.loads(self.release_data)
+        return {}
+    
+    def set_release_data(self, release):
+        """Store the parsed release notes together with the hash used for ETags"""
+        self.release_data = json.dumps(release)
+        self.content_hash = hashlib.sha1(self.release_data.encode('utf-8')).hexdigest()
+
+class ReleasePage(db.Model):
+    """Model for storing the compressed raw HTML of a release notes page with its cache validators"""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.String(20), unique=True, nullable=False)
+    url = db.Column(db.String(255), nullable=False)
+    html_compressed = db.Column(db.LargeBinary, nullable=True)
+    etag = db.Column(db.String(255), nullable=True)
+    last_modified = db.Column(db.String(64), nullable=True)
+    fetch_date = db.Column(db.DateTime, default=datetime.utcnow)
+    check_date = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<ReleasePage {self.version}>"
+    
+    def needs_revalidation(self, max_age):
+        """Check if the stored page should be revalidated against the upstream site"""
+        return self.check_date is None or self.check_date + max_age < datetime.utcnow()
+    
+    def get_html(self):
+        """Get the raw HTML of the page"""
+        if self.html_compressed:
+            return zlib.decompress(self.html_compressed).decode('utf-8')
+        return None
+    
+    def set_html(self, html):
+        """Store the raw HTML of the page compressed"""
+        self.html_compressed = zlib.compress(html.encode('utf-8'), 9)
 
 class ConnectorChange(db.Model):
     """Model for tracking changes by connector"""
     id = db.Column(db.Integer, primary_key=True)
     connector_name = db.Column(db.String(50), nullable=False)
     version = db.Column(db.String(20), nullable=False)
+    version_number = db.Column(db.Integer, index=True, default=_version_number_default)
     change_type = db.Column(db.String(20), nullable=False)  # breaking, feature, other
     description = db.Column(db.Text, nullable=False)
+    description_hash = db.Column(db.String(40), nullable=False,
+                                 default=lambda context: hash_description(context.get_current_parameters()['description']))
     impact = db.Column(db.String(20), nullable=True)  # high, medium, low
     create_date = db.Column(db.DateTime, default=datetime.utcnow)
     
+    __table_args__ = (
+        db.Index('unique_connector_change', 'connector_name', 'version', 'change_type', 'description_hash', unique=True),
+        db.Index('ix_connector_change_connector_version', 'connector_name', 'version_number'),
+    )
+    
     def __repr__(self):
         return f"<ConnectorChange {self.connector_name} {self.version}>"
+    
+    @classmethod
+    def insert_many(cls, records, batch_size=500):
+        """Insert change records in batches, skipping rows that are already stored
+        
+        Records are dictionaries of column values including description_hash.
+        Duplicates within the batch are dropped before anything is sent, and
+        rows that already exist are skipped by the database through the unique
+        index. Returns the number of records sent to the database.
+        """
+        unique_records = {}
+        for record in records:
+            key = (record['connector_name'], record['version'], record['change_type'], record['description_hash'])
+            unique_records.setdefault(key, record)
+        rows = list(unique_records.values())
+        if not rows:
+            return 0
+        
+        now = datetime.utcnow()
+        for row in rows:
+            row.setdefault('version_number', version_to_number(row['version']))
+            row.setdefault('create_date', now)
+        
+        index_columns = ['connector_name', 'version', 'change_type', 'description_hash']
+        dialect = db.session.get_bind().dialect.name
+        for i in range(0, len(rows), batch_size):
+            batch = rows[i:i + batch_size]
+            if dialect == 'postgresql':
+                statement = postgresql.insert(cls).values(batch).on_conflict_do_nothing(index_elements=index_columns)
+            elif dialect == 'sqlite':
+                statement = sqlite.insert(cls).values(batch).on_conflict_do_nothing(index_elements=index_columns)
+            else:
+                # No portable upsert; skip the rows that are already stored
+                existing = {
+                    tuple(row) for row in db.session.query(
+                        cls.connector_name, cls.version, cls.change_type, cls.description_hash
+                    ).filter(cls.version.in_({record['version'] for record in batch})).all()
+                }
+                batch = [record for record in batch if tuple(record[column] for column in index_columns) not in existing]
+                if not batch:
+                    continue
+                statement = insert(cls).values(batch)
+            db.session.execute(statement)
+        
+        return len(rows)
@@ -0,0 +1,73 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from config import logger
+from connectors import classify_release
+from metrics import timed
+
+# Parsing is pure Python and holds the GIL, so bulk ingests and reparses spread
+# it over worker processes. Workers get raw HTML and send back the parsed
+# release; the calling process classifies the releases in page order, against
+# its own connector registry, so the result does not depend on the number of
+# workers.
+
+# Pages sent to a worker at a time; larger chunks cost fewer round trips but
+# leave workers idle at the end of a batch
+PARSE_CHUNK_SIZE = 4
+
+def parse_workers(setting):
+    """Number of parse processes for a PARSE_WORKERS setting; 0 means one per CPU"""
+    return setting if setting > 0 else os.cpu_count() or 1
+
+def parse_page(page):
+    """Parse one (version, html) page, returning (version, release, None) or (version, None, error)"""
+    # Imported here so processes serving stored releases never load the parser
+    from release_parser import parse_release_notes
+    
+    version, html = page
+    try:
+        with timed('parse'):
+            return version, parse_release_notes(html), None
+    except Exception as e:
+        return version, None, str(e)
+
+@contextmanager
+def parse_pool(workers):
+    """A process pool for parse_pages with workers processes, or None to parse in this process"""
+    if workers <= 1:
+        yield None
+        return
+    
+    # spawn: the parent may be running fetch threads, which do not survive a fork safely
+    executor = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'))
+    logger.info(f"Started {workers} parse workers")
+    try:
+        yield executor
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+def parse_pages(pages, executor=None, chunk_size=PARSE_CHUNK_SIZE):
+    """Parse and classify (version, html) pages, yielding (version, release, records) in page order
+    
+    records are ConnectorChange records ready for ConnectorChange.insert_many.
+    release is None if the page could not be parsed; records then holds the error.
+    Without an executor pages are parsed here one at a time as they are consumed,
+    so a lazy iterable of pages is processed as it arrives.
+    """
+    if executor is None:
+        results = map(parse_page, pages)
+    else:
+        results = executor.map(parse_page, pages, chunksize=chunk_size)
+    
+    for version, release, error in results:
+        if release is None:
+            yield version, None, error
+            continue
+        try:
+            with timed('classify'):
+                records = classify_release(version, release)
+        except Exception as e:
+            yield version, None, str(e)
+            continue
+        yield version, release, records
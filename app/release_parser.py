@@ -0,0 +1,168 @@
+import re
+from html.parser import HTMLParser
+
+BREAKING_SECTION_RE = re.compile(r'breaking changes', re.IGNORECASE)
+FEATURE_SECTION_RE = re.compile(r'new features|feature changes', re.IGNORECASE)
+CONNECTOR_SECTION_RE = re.compile(r'connector', re.IGNORECASE)
+SECTION_START_RE = re.compile(r'^[a-zA-Z]')
+
+HEADING_TAGS = ('h2', 'h3')
+LIST_TAGS = ('ul', 'ol')
+SKIPPED_TAGS = ('script', 'style')
+
+class ReleaseNoteParser(HTMLParser):
+    """Streaming parser that splits a release notes page into sections in a single pass
+    
+    A section starts at every h2/h3 heading whose text starts with a letter and runs
+    until the next one. Each section collects the text of its top-level list items
+    and of the paragraphs outside of lists, in document order. Text is joined the way
+    BeautifulSoup's get_text(strip=True) does, so items match what the previous
+    tree-walking parser produced, except that every item is reported once.
+    """
+    
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        # List of (title, entries) tuples in document order, where entries are
+        # ('item', text) or ('paragraph', text) tuples
+        self.sections = []
+        self._section = None
+        self._text = ''
+        self._heading = None
+        self._headerlink_depth = 0
+        self._list_depth = 0
+        self._item = None
+        self._item_list_depth = 0
+        self._paragraph = None
+        self._skip_depth = 0
+    
+    def _flush_text(self):
+        """Hand the pending text run to whatever is being collected"""
+        text = self._text.strip()
+        self._text = ''
+        if not text:
+            return
+        if self._heading is not None:
+            if not self._headerlink_depth:
+                self._heading.append(text)
+        elif self._item is not None:
+            self._item.append(text)
+        elif self._paragraph is not None:
+            self._paragraph.append(text)
+    
+    def _finish_item(self):
+        if self._item is not None and self._section is not None:
+            self._section[1].append(('item', ''.join(self._item)))
+        self._item = None
+    
+    def _finish_paragraph(self):
+        if self._paragraph is not None and self._section is not None:
+            text = ''.join(self._paragraph)
+            if text:
+                self._section[1].append(('paragraph', text))
+        self._paragraph = None
+    
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        
+        if tag in SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag in HEADING_TAGS:
+            self._finish_paragraph()
+            self._heading = []
+        elif tag == 'a' and self._heading is not None:
+            classes = (dict(attrs).get('class') or '').split()
+            if self._headerlink_depth or 'headerlink' in classes:
+                self._headerlink_depth += 1
+        elif tag in LIST_TAGS:
+            self._finish_paragraph()
+            self._list_depth += 1
+        elif tag == 'li':
+            if self._item is not None and self._list_depth == self._item_list_depth:
+                # An unclosed sibling item is implicitly closed by the next one
+                self._finish_item()
+            if self._item is None:
+                self._item = []
+                self._item_list_depth = self._list_depth
+        elif tag == 'p':
+            if self._item is None:
+                self._finish_paragraph()
+                self._paragraph = []
+    
+    def handle_endtag(self, tag):
+        self._flush_text()
+        
+        if tag in SKIPPED_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in HEADING_TAGS and self._heading is not None:
+            title = ''.join(self._heading)
+            self._heading = None
+            self._headerlink_depth = 0
+            if SECTION_START_RE.search(title):
+                self._finish_item()
+                self._section = (title, [])
+                self.sections.append(self._section)
+        elif tag == 'a' and self._headerlink_depth:
+            self._headerlink_depth -= 1
+        elif tag in LIST_TAGS:
+            self._list_depth = max(self._list_depth - 1, 0)
+            if self._item is not None and self._list_depth < self._item_list_depth:
+                self._finish_item()
+        elif tag == 'li':
+            if self._item is not None and self._list_depth == self._item_list_depth:
+                self._finish_item()
+        elif tag == 'p':
+            if self._item is None:
+                self._finish_paragraph()
+    
+    def handle_data(self, data):
+        if not self._skip_depth:
+            self._text += data
+    
+    def handle_comment(self, data):
+        # Comments split text runs but are not part of the text
+        self._flush_text()
+    
+    def close(self):
+        super().close()
+        self._flush_text()
+        self._finish_item()
+        self._finish_paragraph()
+
+def parse_release_notes(html):
+    """Parse a Trino release notes page into breaking, feature and connector items"""
+    release = {
+        'breaking_changes': [],
+        'new_features': [],
+        'connectors': []
+    }
+    
+    parser = ReleaseNoteParser()
+    parser.feed(html)
+    parser.close()
+    
+    breaking_found = False
+    features_found = False
+    for title, entries in parser.sections:
+        items = [text for kind, text in entries if kind == 'item']
+        
+        # Only the first breaking changes and new features sections are used
+        if not breaking_found and BREAKING_SECTION_RE.search(title):
+            breaking_found = True
+            release['breaking_changes'].extend(
+                text for kind, text in entries
+                if kind == 'item' or not text.lower().startswith(('note:', 'warning:'))
+            )
+        
+        if not features_found and FEATURE_SECTION_RE.search(title):
+            features_found = True
+            release['new_features'].extend(items)
+        
+        if CONNECTOR_SECTION_RE.search(title) and items:
+            # Clean up connector name (e.g., "BigQuery connector" -> "BigQuery")
+            connector_name = CONNECTOR_SECTION_RE.sub('', title).strip()
+            release['connectors'].append({
+                'connector': connector_name,
+                'items': items
+            })
+    
+    return release
@@ -1,9 +1,14 @@
-import requests
-from bs4 import BeautifulSoup
-import re
-import json
+import hashlib
+import threading
+import time
 from datetime import datetime, timedelta
-from config import logger
+from sqlalchemy.exc import IntegrityError
+from config import db, logger
+from connectors import connector_classifier
+from singleflight import SingleFlight, cross_process_lock
+from metrics import CACHE_REQUESTS, timed
+
+comparison_flight = SingleFlight()
 
 def version_compare(v1, v2):
     """Compare two version strings"""
@@ -24,11 +29,196 @@ def version_compare(v1, v2):
     
     return 0
 
-def fetch_trino_changes(from_version, to_version, app, db):
-    """Fetch breaking changes and feature differences from Trino website release notes"""
+def get_release_notes(versions, app, db, scrape=True, progress=None, problems=None, parse_executor=None):
+    """Get parsed release notes for the given versions, scraping only releases not stored yet"""
+    # problems collects version -> 'missing' (could not be fetched), 'stale'
+    # (stored copy could not be revalidated) or 'unpublished' (404, not stored)
+    if problems is None:
+        problems = {}
+    
     # Import models here to avoid circular imports
-    from models import VersionComparison
+    from models import ConnectorChange, ReleaseNote, ReleasePage, VersionComparison, version_to_number
     
+    # Only numbered releases exist and can be looked up by version_number
+    invalid_versions = [version for version in versions if version_to_number(version) is None]
+    if invalid_versions:
+        logger.warning(f"Skipping versions that are not release numbers: {invalid_versions}")
+        versions = [version for version in versions if version_to_number(version) is not None]
+    if not versions:
+        return {}
+    
+    releases = {}
+    stored_notes = {}
+    stored_pages = {}
+    
+    def report(version):
+        if progress is None:
+            return
+        try:
+            progress(version, releases.get(version))
+        except Exception as e:
+            logger.error(f"Error reporting progress for version {version}: {str(e)}")
+    
+    with app.app_context():
+        try:
+            with timed('db_read'):
+                # One indexed range scan covers the requested versions
+                wanted_versions = set(versions)
+                version_numbers = [version_to_number(version) for version in versions]
+                release_notes = ReleaseNote.query.filter(
+                    ReleaseNote.version_number.between(min(version_numbers), max(version_numbers))
+                ).order_by(ReleaseNote.version_number).all()
+                for release_note in release_notes:
+                    if release_note.version not in wanted_versions:
+                        continue
+                    stored_notes[release_note.version] = release_note
+                    releases[release_note.version] = release_note.get_release_data()
+                # Stored pages are only needed to revalidate or refetch releases
+                if scrape:
+                    for release_page in ReleasePage.query.filter(ReleasePage.version.in_(versions)).all():
+                        stored_pages[release_page.version] = release_page
+        except Exception as e:
+            logger.error(f"Error loading stored release notes: {str(e)}")
+        
+        max_age = timedelta(days=app.config.get("RELEASE_REVALIDATE_DAYS", 30))
+        missing_versions = [version for version in versions if version not in releases]
+        stale_versions = [
+            version for version in versions
+            if version in releases and version in stored_pages and stored_pages[version].needs_revalidation(max_age)
+        ]
+        fetch_versions = [version for version in versions if version in missing_versions or version in stale_versions]
+        if not scrape:
+            fetch_versions = []
+            if missing_versions:
+                logger.info(f"Scraping disabled, skipping versions not stored yet: {missing_versions}")
+                problems.update((version, 'missing') for version in missing_versions)
+        
+        for version in versions:
+            if version not in fetch_versions:
+                report(version)
+        if not fetch_versions:
+            return releases
+        
+        # Imported here so processes serving stored releases never load the HTTP
+        # client or the parser
+        from fetcher import DEFAULT_RELEASE_URL, fetch_release_pages, get_breaker
+        from parse_pool import parse_pages
+        
+        if missing_versions:
+            logger.info(f"Scraping release notes for versions not stored yet: {missing_versions}")
+        if stale_versions:
+            logger.info(f"Revalidating stored release pages: {stale_versions}")
+        
+        validators = {
+            version: (stored_pages[version].etag, stored_pages[version].last_modified)
+            for version in stale_versions
+        }
+        pages = fetch_release_pages(
+            fetch_versions,
+            release_url=app.config.get("TRINO_RELEASE_URL", DEFAULT_RELEASE_URL),
+            max_workers=app.config.get("SCRAPER_MAX_WORKERS", 8),
+            timeout=app.config.get("SCRAPER_TIMEOUT", 10),
+            validators=validators,
+            retries=app.config.get("SCRAPER_RETRIES", 2),
+            backoff=app.config.get("SCRAPER_BACKOFF", 0.5),
+            hedge_after=app.config.get("SCRAPER_HEDGE_AFTER", 2),
+            deadline=app.config.get("SCRAPER_DEADLINE", 30),
+            breaker=get_breaker(app.config.get("SCRAPER_BREAKER_THRESHOLD", 5),
+                                app.config.get("SCRAPER_BREAKER_RESET", 30))
+        )
+        not_modified = 0
+        fetched = {}
+        
+        def changed_pages():
+            """Settle the fetched pages that need no parsing, yielding the others as (version, html)"""
+            nonlocal not_modified
+            for version, result in pages:
+                if result is None:
+                    # Serve the stored release, if any, but say it may be out of date
+                    problems[version] = 'stale' if version in releases else 'missing'
+                    report(version)
+                    continue
+                
+                if result.status_code == 404:
+                    if version in releases:
+                        logger.warning(f"Stored release {version} is no longer published, keeping it")
+                    else:
+                        # Reported so the range is not cached until the release is out
+                        problems[version] = 'unpublished'
+                    report(version)
+                    continue
+                
+                release_page = stored_pages.get(version)
+                if result.status_code == 304 or (
+                    release_page is not None and version in releases and release_page.get_html() == result.html
+                ):
+                    # Page unchanged upstream (or the server did not honour the
+                    # validators but the content is the same): keep the stored release
+                    release_page.etag = result.etag
+                    release_page.last_modified = result.last_modified
+                    release_page.check_date = datetime.utcnow()
+                    if result.status_code == 304:
+                        not_modified += 1
+                    report(version)
+                    continue
+                
+                fetched[version] = result
+                yield version, result.html
+        
+        change_records = []
+        for version, release, records in parse_pages(changed_pages(), parse_executor):
+            result = fetched.pop(version)
+            if release is None:
+                logger.error(f"Error processing version {version}: {records}")
+                problems[version] = 'stale' if version in releases else 'missing'
+                report(version)
+                continue
+            
+            now = datetime.utcnow()
+            release_page = stored_pages.get(version)
+            if release_page is None:
+                release_page = ReleasePage(version=version, url=result.url)
+                db.session.add(release_page)
+            release_page.url = result.url
+            release_page.set_html(result.html)
+            release_page.etag = result.etag
+            release_page.last_modified = result.last_modified
+            release_page.fetch_date = now
+            release_page.check_date = now
+            
+            releases[version] = release
+            if version in stored_notes:
+                stored_notes[version].set_release_data(release)
+                # The release changed upstream, so its connector changes are rebuilt
+                # and cached comparisons that include it are dropped
+                ConnectorChange.query.filter_by(version=version).delete(synchronize_session=False)
+                VersionComparison.query.filter(
+                    db.cast(VersionComparison.from_version, db.Integer) < int(version),
+                    db.cast(VersionComparison.to_version, db.Integer) >= int(version)
+                ).delete(synchronize_session=False)
+            else:
+                release_note = ReleaseNote(version=version)
+                release_note.set_release_data(release)
+                db.session.add(release_note)
+            change_records.extend(records)
+            report(version)
+        
+        try:
+            with timed('db_write'):
+                ConnectorChange.insert_many(change_records)
+                db.session.commit()
+            logger.info(f"Stored release notes for {len(releases)} of {len(versions)} versions "
+                        f"({not_modified} revalidated as not modified)")
+            if problems:
+                logger.warning(f"Incomplete release notes: {problems}")
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error storing release notes: {str(e)}")
+    
+    return releases
+
+def build_changes(versions, releases):
+    """Build the comparison data for a range of versions from their parsed release notes"""
     changes = {
         'breaking_changes': [],
         'new_features': [],
@@ -36,14 +226,74 @@ def fetch_trino_changes(from_version, to_version, app, db):
         'performance_improvements': []
     }
     
-    # Determine version order
-    if version_compare(from_version, to_version) > 0:
-        # Swap versions if from_version is newer than to_version
-        logger.info(f"Swapping from_version {from_version} and to_version {to_version} to maintain chronological order")
-        from_version, to_version = to_version, from_version
+    for version in versions:
+        release = releases.get(version)
+        if not release:
+            continue
+        
+        if release.get('breaking_changes'):
+            changes['breaking_changes'].append({
+                'version': version,
+                'items': release['breaking_changes']
+            })
+        
+        if release.get('new_features'):
+            changes['new_features'].append({
+                'version': version,
+                'items': release['new_features']
+            })
+        
+        # Connector sections are reported as new features; in a real application
+        # you'd want to analyze the text to categorize it
+        for connector in release.get('connectors', []):
+            changes['new_features'].append({
+                'version': version,
+                'connector': connector['connector'],
+                'items': connector['items']
+            })
+    
+    return changes
 
-    # Check if we have a cached result
+# Bump when the shape of compare responses changes so old ETags stop matching
+COMPARISON_FORMAT = 1
+
+def comparison_etag(from_version, to_version, app, db):
+    """Compute a strong ETag for a comparison from the stored releases in its range
+    
+    Returns (etag, complete), where complete tells whether every release in the
+    range is stored, i.e. whether the ETag can be trusted before the comparison
+    is built.
+    """
+    # Import models here to avoid circular imports
+    from models import ReleaseNote
+    
+    low, high = int(from_version) + 1, int(to_version)
+    # Not the live classifier's fingerprint, which also covers connectors this
+    # process registered while scraping
+    fingerprint = sync_connector_registry(app, db)
+    
     with app.app_context():
+        rows = db.session.query(ReleaseNote.version_number, ReleaseNote.content_hash).filter(
+            ReleaseNote.version_number.between(low, high)
+        ).order_by(ReleaseNote.version_number).all()
+    
+    digest = hashlib.sha1(
+        f"{COMPARISON_FORMAT}:{from_version}:{to_version}:{fingerprint}".encode('utf-8')
+    )
+    for version_number, content_hash in rows:
+        digest.update(f"{version_number}:{content_hash};".encode('utf-8'))
+    
+    return digest.hexdigest(), len(rows) == max(high - low + 1, 0)
+
+def get_cached_comparison(from_version, to_version, app, record_stats=True):
+    """Get a valid cached comparison for an ordered version range, or None
+    
+    With record_stats=False the lookup does not count as a cache hit or miss.
+    """
+    # Import models here to avoid circular imports
+    from models import VersionComparison
+    
+    with app.app_context(), timed('cache_lookup'):
         try:
             cached_comparison = VersionComparison.query.filter_by(
                 from_version=from_version, 
@@ -52,142 +302,407 @@ def fetch_trino_changes(from_version, to_version, app, db):
             
             if cached_comparison and cached_comparison.is_valid():
                 logger.info(f"Using cached comparison data for {from_version} to {to_version}")
-                if cached_comparison.comparison_data:
+                if cached_comparison.has_comparison_data():
                     cached_data = cached_comparison.get_comparison_data()
                     if cached_data:
                         logger.info(f"Successfully retrieved cached data for versions {from_version} to {to_version}")
+                        if record_stats:
+                            CACHE_REQUESTS.inc(cache='database', result='hit')
+                            try:
+                                cached_comparison.record_hit()
+                            except Exception as e:
+                                db.session.rollback()
+                                logger.warning(f"Error recording cache hit for {from_version} to {to_version}: {str(e)}")
                         return cached_data
                     else:
-                        logger.warning(f"Cached data for versions {from_version} to {to_version} was invalid, scraping fresh data")
+                        logger.warning(f"Cached data for versions {from_version} to {to_version} was invalid, building fresh data")
                 else:
                     logger.warning(f"Cached comparison exists but has no data for {from_version} to {to_version}")
             else:
                 if cached_comparison:
-                    logger.info(f"Cached comparison for {from_version} to {to_version} has expired. Fetching fresh data.")
+                    logger.info(f"Cached comparison for {from_version} to {to_version} has expired. Building fresh data.")
                 else:
-                    logger.info(f"No cached comparison found for {from_version} to {to_version}. Fetching new data.")
+                    logger.info(f"No cached comparison found for {from_version} to {to_version}. Building new data.")
         except Exception as e:
             logger.error(f"Error checking cached data: {str(e)}")
-            # Continue with scraping
+            # Continue with building the comparison
+    
+    if record_stats:
+        CACHE_REQUESTS.inc(cache='database', result='miss')
+    return None
+
+def store_comparison(from_version, to_version, changes, app, db):
+    """Cache the comparison data for an ordered version range"""
+    # Import models here to avoid circular imports
+    from models import VersionComparison
+    
+    with app.app_context():
+        # Check if we already have a record
+        comparison = VersionComparison.query.filter_by(
+            from_version=from_version, 
+            to_version=to_version
+        ).first()
+        
+        if comparison is None:
+            comparison = VersionComparison(from_version=from_version, to_version=to_version)
+            db.session.add(comparison)
+        comparison.expire_date = datetime.utcnow() + timedelta(days=app.config.get("COMPARISON_CACHE_TTL_DAYS", 30))
+        comparison.last_access = datetime.utcnow()
+        
+        # Stored as compressed JSON
+        with timed('serialize'):
+            comparison.set_comparison_data(changes)
+        
+        try:
+            with timed('db_write'):
+                db.session.commit()
+            logger.info(f"Cached comparison data for {from_version} to {to_version}")
+        except IntegrityError:
+            # Another process cached the same range first; its data is just as good
+            db.session.rollback()
+            logger.info(f"Comparison for {from_version} to {to_version} was already cached by another process")
+            return
+        
+        maybe_sweep_comparison_cache(app, db)
 
-    # Get all versions between from_version and to_version
+_sweep_lock = threading.Lock()
+_last_sweep = None
+
+def maybe_sweep_comparison_cache(app, db):
+    """Sweep the comparison cache if this process has not done so for COMPARISON_CACHE_SWEEP_INTERVAL seconds"""
+    global _last_sweep
+    
+    interval = app.config.get("COMPARISON_CACHE_SWEEP_INTERVAL", 300)
+    with _sweep_lock:
+        now = time.monotonic()
+        if _last_sweep is not None and now - _last_sweep < interval:
+            return
+        _last_sweep = now
+    
     try:
-        versions = []
-        for v in range(int(from_version), int(to_version) + 1):
-            versions.append(str(v))
+        sweep_comparison_cache(app, db)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Error sweeping comparison cache: {str(e)}")
+
+def sweep_comparison_cache(app, db):
+    """Delete expired cached comparisons, then the least recently used ones beyond the size limits
+    
+    Returns the number of entries deleted.
+    """
+    # Import models here to avoid circular imports
+    from models import VersionComparison
+    
+    max_entries = app.config.get("COMPARISON_CACHE_MAX_ENTRIES", 1000)
+    max_bytes = app.config.get("COMPARISON_CACHE_MAX_BYTES", 256 * 1024 * 1024)
+    
+    with app.app_context():
+        expired = VersionComparison.query.filter(
+            VersionComparison.expire_date < datetime.utcnow()
+        ).delete(synchronize_session=False)
+        
+        # Keep the most recently used entries that fit within both limits
+        entries = db.session.query(VersionComparison.id, VersionComparison.size_expression()).order_by(
+            VersionComparison.last_access.desc(), VersionComparison.id.desc()
+        ).all()
+        evict_ids = []
+        kept_bytes = 0
+        for index, (comparison_id, size) in enumerate(entries):
+            kept_bytes += size or 0
+            if index >= max_entries or kept_bytes > max_bytes:
+                evict_ids.append(comparison_id)
+                kept_bytes -= size or 0
+        for i in range(0, len(evict_ids), 500):
+            VersionComparison.query.filter(
+                VersionComparison.id.in_(evict_ids[i:i + 500])
+            ).delete(synchronize_session=False)
+        
+        db.session.commit()
+    
+    if expired or evict_ids:
+        logger.info(f"Swept comparison cache: {expired} expired and {len(evict_ids)} least recently used entries deleted")
+    return expired + len(evict_ids)
+
+def comparison_cache_stats(app, db):
+    """Size and hit statistics of the comparison cache table"""
+    # Import models here to avoid circular imports
+    from models import VersionComparison
+    
+    with app.app_context():
+        entries, expired, bytes_used, stored_hits = db.session.query(
+            db.func.count(VersionComparison.id),
+            db.func.coalesce(db.func.sum(db.case((VersionComparison.expire_date < datetime.utcnow(), 1), else_=0)), 0),
+            db.func.coalesce(db.func.sum(VersionComparison.size_expression()), 0),
+            db.func.coalesce(db.func.sum(VersionComparison.hit_count), 0)
+        ).one()
+    
+    # Hits and misses of this process since it started; hit_count is kept per entry
+    hits = CACHE_REQUESTS.value(cache='database', result='hit')
+    misses = CACHE_REQUESTS.value(cache='database', result='miss')
+    return {
+        'entries': entries,
+        'expired_entries': int(expired),
+        'bytes_used': int(bytes_used),
+        'max_entries': app.config.get("COMPARISON_CACHE_MAX_ENTRIES", 1000),
+        'max_bytes': app.config.get("COMPARISON_CACHE_MAX_BYTES", 256 * 1024 * 1024),
+        'ttl_days': app.config.get("COMPARISON_CACHE_TTL_DAYS", 30),
+        'stored_hit_count': int(stored_hits),
+        'process_hits': hits,
+        'process_misses': misses,
+        'process_hit_ratio': round(hits / (hits + misses), 4) if hits + misses else None
+    }
+
+def build_comparison_data(from_version, to_version, app, db, progress=None):
+    """Build and cache the comparison data for an ordered version range
+    
+    Runs under a cross-process lock for the range, so only one worker scrapes a
+    given range while the others wait and then read its cached result. Releases
+    that could not be fetched are listed in missing_versions and stale_versions,
+    and releases that are not published yet in unpublished_versions.
+    """
+    use_comparison_cache = app.config.get("COMPARISON_CACHE_ENABLED", True)
+    
+    with cross_process_lock(f"comparison:{from_version}:{to_version}", db, app.config.get("LOCK_DIR")):
+        if use_comparison_cache:
+            # Another process may have built the range while we waited for the lock
+            cached_data = get_cached_comparison(from_version, to_version, app, record_stats=False)
+            if cached_data:
+                return cached_data
+        
+        # Get all versions between from_version and to_version, skipping the starting version
+        versions = [str(v) for v in range(int(from_version) + 1, int(to_version) + 1)]
         
         logger.info(f"Fetching changes between versions: {from_version} and {to_version}")
         logger.info(f"Processing versions: {versions}")
         
-        for version in versions:
-            if version == from_version:
-                continue  # Skip the starting version
-                
-            url = f"https://trino.io/docs/current/release/release-{version}.html"
-            logger.info(f"Fetching release notes from {url}")
-            
-            try:
-                response = requests.get(url, timeout=10)
-                if response.status_code != 200:
-                    logger.warning(f"Failed to fetch release notes for version {version}, status code: {response.status_code}")
-                    continue
-                    
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Extract breaking changes
-                breaking_section = soup.find(['h2', 'h3'], text=re.compile(r'breaking changes', re.IGNORECASE))
-                if breaking_section:
-                    breaking_list = []
-                    current = breaking_section.find_next(['p', 'ul', 'h2', 'h3'])
-                    while current and current.name not in ['h2', 'h3'] or (current.name in ['h2', 'h3'] and not re.search(r'^[a-zA-Z]', current.get_text(strip=True))):
-                        if current.name == 'ul':
-                            for li in current.find_all('li'):
-                                breaking_list.append(li.get_text(strip=True))
-                        elif current.name == 'p':
-                            text = current.get_text(strip=True)
-                            if text and not text.lower().startswith(('note:', 'warning:')):
-                                breaking_list.append(text)
-                        current = current.find_next(['p', 'ul', 'h2', 'h3'])
-                    
-                    if breaking_list:
-                        changes['breaking_changes'].append({
-                            'version': version,
-                            'items': breaking_list
-                        })
-                
-                # Extract new features
-                feature_section = soup.find(['h2', 'h3'], text=re.compile(r'new features|feature changes', re.IGNORECASE))
-                if feature_section:
-                    feature_list = []
-                    current = feature_section.find_next(['p', 'ul', 'h2', 'h3'])
-                    while current and current.name not in ['h2', 'h3'] or (current.name in ['h2', 'h3'] and not re.search(r'^[a-zA-Z]', current.get_text(strip=True))):
-                        if current.name == 'ul':
-                            for li in current.find_all('li'):
-                                feature_list.append(li.get_text(strip=True))
-                        current = current.find_next(['p', 'ul', 'h2', 'h3'])
-                    
-                    if feature_list:
-                        changes['new_features'].append({
-                            'version': version,
-                            'items': feature_list
-                        })
-                
-                # Try to identify connector-specific sections
-                connector_sections = soup.find_all(['h2', 'h3'], text=re.compile(r'connector', re.IGNORECASE))
-                for section in connector_sections:
-                    connector_name = section.get_text(strip=True)
-                    # Clean up connector name (e.g., "BigQuery connector" -> "BigQuery")
-                    connector_name = re.sub(r'connector', '', connector_name, flags=re.IGNORECASE).strip()
-                    
-                    connector_changes = []
-                    current = section.find_next(['p', 'ul', 'h2', 'h3'])
-                    while current and current.name not in ['h2', 'h3'] or (current.name in ['h2', 'h3'] and not re.search(r'^[a-zA-Z]', current.get_text(strip=True))):
-                        if current.name == 'ul':
-                            for li in current.find_all('li'):
-                                connector_changes.append(li.get_text(strip=True))
-                        current = current.find_next(['p', 'ul', 'h2', 'h3'])
-                    
-                    if connector_changes:
-                        # Determine if this is a new feature or breaking change
-                        # For simplicity, we'll add it to new_features
-                        # In a real application, you'd want to analyze the text to categorize it
-                        changes['new_features'].append({
-                            'version': version,
-                            'connector': connector_name,
-                            'items': connector_changes
-                        })
-            
-            except Exception as e:
-                logger.error(f"Error processing version {version}: {str(e)}")
-                continue
+        problems = {}
+        releases = get_release_notes(versions, app, db, scrape=app.config.get("SCRAPE_ON_DEMAND", True),
+                                     progress=progress, problems=problems)
+        changes = build_changes(versions, releases)
+        
+        if problems:
+            # Incomplete results are returned but never cached, so the next
+            # request tries the failed releases again
+            changes['missing_versions'] = [version for version in versions if problems.get(version) == 'missing']
+            changes['stale_versions'] = [version for version in versions if problems.get(version) == 'stale']
+            changes['unpublished_versions'] = [version for version in versions if problems.get(version) == 'unpublished']
+        elif use_comparison_cache:
+            store_comparison(from_version, to_version, changes, app, db)
         
-        # Cache the result
+        return changes
+
+_registry_lock = threading.Lock()
+_registry_generation = None
+_registry_fingerprint = None
+
+def sync_connector_registry(app, db):
+    """Register the stored releases' connectors in release order if they changed, returning the registry fingerprint"""
+    global _registry_generation, _registry_fingerprint
+    
+    # Import models here to avoid circular imports
+    from models import ConnectorChange, ReleaseNote
+    
+    with _registry_lock:
         with app.app_context():
-            # Convert to JSON
-            cached_data = json.dumps(changes)
-            
-            # Check if we already have a record
-            existing_comparison = VersionComparison.query.filter_by(
-                from_version=from_version, 
-                to_version=to_version
-            ).first()
+            # Storing a release adds a ReleaseNote row, and changing one replaces
+            # its ConnectorChange rows, so these only stay the same while the
+            # stored releases do; this also catches writes by other processes
+            generation = tuple(db.session.query(
+                db.select(db.func.count(ReleaseNote.id)).scalar_subquery(),
+                db.select(db.func.max(ReleaseNote.id)).scalar_subquery(),
+                db.select(db.func.count(ConnectorChange.id)).scalar_subquery(),
+                db.select(db.func.max(ConnectorChange.id)).scalar_subquery()
+            ).one())
+            if generation == _registry_generation:
+                return _registry_fingerprint
             
-            if existing_comparison:
-                existing_comparison.comparison_data = cached_data
-                existing_comparison.expire_date = datetime.utcnow() + timedelta(days=30)
-            else:
-                new_comparison = VersionComparison(
-                    from_version=from_version,
-                    to_version=to_version,
-                    comparison_data=cached_data,
-                    expire_date=datetime.utcnow() + timedelta(days=30)
-                )
-                db.session.add(new_comparison)
-            
-            db.session.commit()
-            logger.info(f"Cached comparison data for {from_version} to {to_version}")
+            # The registry is rebuilt from the stored releases alone, so every
+            # process classifies the same way whatever it registered before
+            names = []
+            for release_note in ReleaseNote.query.order_by(ReleaseNote.version_number):
+                names.extend(connector['connector'] for connector in release_note.get_release_data().get('connectors', []))
         
-        return changes
+        if connector_classifier.reset(names):
+            logger.info(f"Connector registry synced with {len(connector_classifier.registered_names())} connectors")
+        _registry_generation = generation
+        _registry_fingerprint = connector_classifier.fingerprint
+        return _registry_fingerprint
+
+def fetch_trino_changes(from_version, to_version, app, db, progress=None):
+    """Fetch breaking changes and feature differences from Trino website release notes
+    
+    progress is passed on to get_release_notes when the range has to be built; it
+    is not called when the result comes from a cache or another in-flight build.
+    Errors are raised rather than answered with empty changes, which callers
+    would cache as a complete comparison.
+    """
+    # Determine version order
+    if version_compare(from_version, to_version) > 0:
+        # Swap versions if from_version is newer than to_version
+        logger.info(f"Swapping from_version {from_version} and to_version {to_version} to maintain chronological order")
+        from_version, to_version = to_version, from_version
+    
+    # Releases scraped on demand are classified against the stored releases' connectors
+    sync_connector_registry(app, db)
+    
+    # Check if we have a cached result
+    if app.config.get("COMPARISON_CACHE_ENABLED", True):
+        cached_data = get_cached_comparison(from_version, to_version, app)
+        if cached_data:
+            return cached_data
+    
+    try:
+        # Concurrent requests for the same range in this process share one build
+        return comparison_flight.do(
+            (from_version, to_version),
+            lambda: build_comparison_data(from_version, to_version, app, db, progress)
+        )
     except Exception as e:
         logger.error(f"Error fetching changes: {str(e)}")
-        return changes
+        raise
+
+def ingest_releases(app, db, revalidate=False, batch_size=50):
+    """Scrape and store every published release that is not stored yet, including gaps below the highest one
+    
+    With revalidate=True stored pages older than RELEASE_REVALIDATE_DAYS are
+    also revalidated, and stored again if they changed upstream.
+    Returns the list of versions that were stored or revalidated.
+    """
+    # Import models here to avoid circular imports
+    from models import ReleaseNote, ReleasePage, TrinoVersion
+    from fetcher import DEFAULT_RELEASE_INDEX_URL, fetch_release_versions
+    from parse_pool import parse_pool, parse_workers
+    
+    published_versions = fetch_release_versions(
+        app.config.get("TRINO_RELEASE_INDEX_URL", DEFAULT_RELEASE_INDEX_URL),
+        timeout=app.config.get("SCRAPER_TIMEOUT", 10)
+    )
+    
+    with app.app_context():
+        # Every run fills gaps, e.g. releases that failed before or that are
+        # older than ones already scraped on demand
+        stored_versions = {row[0] for row in db.session.query(ReleaseNote.version).all()}
+        new_versions = [version for version in published_versions if version not in stored_versions]
+        stale_versions = []
+        if revalidate:
+            checked_before = datetime.utcnow() - timedelta(days=app.config.get("RELEASE_REVALIDATE_DAYS", 30))
+            stale_versions = [
+                row[0] for row in db.session.query(ReleasePage.version).filter(
+                    db.or_(ReleasePage.check_date.is_(None), ReleasePage.check_date < checked_before)
+                ).all() if row[0] in stored_versions
+            ]
+    
+    if not new_versions and not stale_versions:
+        logger.info("No new or stale releases to ingest")
+        return []
+    
+    versions = sorted(set(new_versions) | set(stale_versions), key=int)
+    logger.info(f"Ingesting {len(new_versions)} new releases and revalidating {len(stale_versions)} stored ones")
+    sync_connector_registry(app, db)
+    
+    ingested = []
+    with parse_pool(parse_workers(app.config.get("PARSE_WORKERS", 0))) as executor:
+        for i in range(0, len(versions), batch_size):
+            batch = versions[i:i + batch_size]
+            problems = {}
+            releases = get_release_notes(batch, app, db, parse_executor=executor, problems=problems)
+            stored = [version for version in batch if version in releases and version not in problems]
+            
+            with app.app_context():
+                known_versions = {
+                    row[0] for row in db.session.query(TrinoVersion.version).filter(TrinoVersion.version.in_(stored)).all()
+                }
+                for version in stored:
+                    if version not in known_versions:
+                        db.session.add(TrinoVersion(version=version))
+                
+                try:
+                    db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Error storing ingested versions: {str(e)}")
+            
+            failed = [version for version in batch if version not in stored]
+            if failed:
+                logger.warning(f"Could not ingest versions: {failed}")
+            ingested.extend(stored)
+    
+    logger.info(f"Ingested {len(ingested)} of {len(versions)} new and stale releases")
+    return ingested
+
+def reparse_releases(app, db, workers=None, batch_size=100):
+    """Parse every stored release page again, e.g. after a parser fix, and store what changed
+    
+    Pages are parsed in workers processes (default PARSE_WORKERS) and the
+    releases are written in batches of batch_size. Releases whose parsed notes
+    changed get new connector changes, and the cached comparisons covering them
+    are dropped. Returns the list of versions that changed.
+    """
+    # Import models here to avoid circular imports
+    from models import ConnectorChange, ReleaseNote, ReleasePage, VersionComparison
+    from parse_pool import parse_pages, parse_pool, parse_workers
+    
+    if workers is None:
+        workers = parse_workers(app.config.get("PARSE_WORKERS", 0))
+    
+    with app.app_context():
+        versions = [
+            row[0] for row in db.session.query(ReleasePage.version).order_by(
+                db.cast(ReleasePage.version, db.Integer)
+            ).all()
+        ]
+    # Every page is classified against the connectors named by the stored releases
+    sync_connector_registry(app, db)
+    
+    logger.info(f"Reparsing {len(versions)} stored release pages with {workers} workers")
+    changed = []
+    with parse_pool(workers) as executor:
+        for i in range(0, len(versions), batch_size):
+            batch = versions[i:i + batch_size]
+            with app.app_context():
+                with timed('db_read'):
+                    pages = {page.version: page.get_html() for page in ReleasePage.query.filter(ReleasePage.version.in_(batch))}
+                    notes = {note.version: note for note in ReleaseNote.query.filter(ReleaseNote.version.in_(batch))}
+                
+                change_records = []
+                batch_changed = []
+                for version, release, records in parse_pages(
+                    ((version, pages[version]) for version in batch if pages.get(version)), executor
+                ):
+                    if release is None:
+                        logger.error(f"Error reparsing version {version}: {records}")
+                        continue
+                    
+                    release_note = notes.get(version)
+                    if release_note is None:
+                        release_note = ReleaseNote(version=version)
+                        db.session.add(release_note)
+                    elif release_note.get_release_data() == release:
+                        continue
+                    release_note.set_release_data(release)
+                    batch_changed.append(version)
+                    change_records.extend(records)
+                
+                try:
+                    with timed('db_write'):
+                        for j in range(0, len(batch_changed), 500):
+                            ConnectorChange.query.filter(
+                                ConnectorChange.version.in_(batch_changed[j:j + 500])
+                            ).delete(synchronize_session=False)
+                        for version in batch_changed:
+                            VersionComparison.query.filter(
+                                db.cast(VersionComparison.from_version, db.Integer) < int(version),
+                                db.cast(VersionComparison.to_version, db.Integer) >= int(version)
+                            ).delete(synchronize_session=False)
+                        ConnectorChange.insert_many(change_records)
+                        db.session.commit()
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Error storing reparsed releases {batch[0]} to {batch[-1]}: {str(e)}")
+                    continue
+            
+            changed.extend(batch_changed)
+            logger.info(f"Reparsed releases {batch[0]} to {batch[-1]}, {len(batch_changed)} changed")
+    
+    logger.info(f"Reparsed {len(versions)} releases, {len(changed)} changed")
+    return changed
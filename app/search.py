@@ -0,0 +1,127 @@
+import re
+from sqlalchemy import text
+from config import db
+
+# Text index over connector_change.description. Postgres uses a GIN index on
+# to_tsvector(), SQLite an external content FTS5 table kept in sync by triggers;
+# both are created by migrations.add_search_index.
+SEARCH_CONFIG = 'english'
+FTS_TABLE = 'connector_change_fts'
+
+# External content table: the text lives in connector_change
+SQLITE_FTS_DDL = (
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "description, content='connector_change', content_rowid='id', tokenize='porter unicode61')"
+)
+
+CHANGE_TYPES = ('breaking', 'feature')
+MAX_PER_PAGE = 100
+
+QUERY_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+def query_terms(query):
+    """Split a search query into words and "quoted phrases" """
+    terms = []
+    for phrase, word in QUERY_TERM_RE.findall(query):
+        term = (phrase or word).strip()
+        if term:
+            terms.append(term)
+    return terms
+
+def fts5_query(terms):
+    """Build an FTS5 MATCH expression requiring every term, with each term quoted
+    so that user input cannot use FTS5 operators or column filters"""
+    return ' '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+
+def _filters(connector, from_number, to_number, change_type):
+    """SQL conditions and parameters shared by the search queries of every dialect"""
+    conditions = []
+    params = {}
+    if connector:
+        conditions.append("lower(c.connector_name) = lower(:connector)")
+        params['connector'] = connector
+    if from_number is not None:
+        conditions.append("c.version_number >= :from_number")
+        params['from_number'] = from_number
+    if to_number is not None:
+        conditions.append("c.version_number <= :to_number")
+        params['to_number'] = to_number
+    if change_type:
+        conditions.append("c.change_type = :change_type")
+        params['change_type'] = change_type
+    return conditions, params
+
+def _search_sql(dialect, terms):
+    """FROM/WHERE clause, rank expression and parameters matching terms in dialect"""
+    if dialect == 'postgresql':
+        # websearch_to_tsquery understands quoted phrases and never raises on user input
+        return (
+            f"connector_change c, websearch_to_tsquery('{SEARCH_CONFIG}', :query) q",
+            [f"to_tsvector('{SEARCH_CONFIG}', c.description) @@ q"],
+            f"ts_rank(to_tsvector('{SEARCH_CONFIG}', c.description), q) DESC",
+            {'query': ' '.join(f'"{term}"' if ' ' in term else term for term in terms)}
+        )
+    if dialect == 'sqlite':
+        # bm25() is lower for better matches
+        return (
+            f"{FTS_TABLE} JOIN connector_change c ON c.id = {FTS_TABLE}.rowid",
+            [f"{FTS_TABLE} MATCH :query"],
+            f"bm25({FTS_TABLE})",
+            {'query': fts5_query(terms)}
+        )
+    
+    # Without a text index every term has to appear as a substring
+    params = {f'term{i}': f'%{term.lower()}%' for i, term in enumerate(terms)}
+    return (
+        "connector_change c",
+        [f"lower(c.description) LIKE :term{i}" for i in range(len(terms))],
+        "c.version_number DESC",
+        params
+    )
+
+def search_changes(query, connector=None, from_number=None, to_number=None, change_type=None,
+                   page=1, per_page=20):
+    """Full-text search of the stored connector changes
+    
+    Every word or "quoted phrase" of the query has to match. Results are ranked
+    by relevance, then newest release first, and paginated.
+    """
+    terms = query_terms(query)
+    result = {
+        'query': query,
+        'page': page,
+        'per_page': per_page,
+        'total': 0,
+        'results': []
+    }
+    if not terms:
+        return result
+    
+    source, conditions, rank, params = _search_sql(db.engine.dialect.name, terms)
+    filter_conditions, filter_params = _filters(connector, from_number, to_number, change_type)
+    where = ' AND '.join(conditions + filter_conditions)
+    params.update(filter_params)
+    
+    result['total'] = db.session.execute(text(f"SELECT COUNT(*) FROM {source} WHERE {where}"), params).scalar()
+    if not result['total']:
+        return result
+    
+    rows = db.session.execute(text(
+        f"SELECT c.id, c.connector_name, c.version, c.change_type, c.impact, c.description "
+        f"FROM {source} WHERE {where} "
+        f"ORDER BY {rank}, c.version_number DESC, c.id "
+        f"LIMIT :limit OFFSET :offset"
+    ), dict(params, limit=per_page, offset=(page - 1) * per_page)).all()
+    
+    result['results'] = [
+        {
+            'id': row.id,
+            'connector': row.connector_name,
+            'version': row.version,
+            'change_type': row.change_type,
+            'impact': row.impact,
+            'description': row.description
+        }
+        for row in rows
+    ]
+    return result
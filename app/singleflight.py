@@ -0,0 +1,87 @@
+import hashlib
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from sqlalchemy import text
+from config import logger
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Run a computation once per key while concurrent callers with the same key wait for its result"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+    
+    def do(self, key, fn):
+        """Call fn() unless a call for key is already running, in which case wait for its result"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        
+        if not leader:
+            logger.info(f"Waiting for in-flight computation of {key}")
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+def _lock_id(key):
+    """Map a key to the signed 64-bit integer used by Postgres advisory locks"""
+    return int.from_bytes(hashlib.sha1(key.encode('utf-8')).digest()[:8], 'big', signed=True)
+
+@contextmanager
+def cross_process_lock(key, db, lock_dir=None):
+    """Hold a lock on key shared by every process using the same database
+    
+    Uses a session-level advisory lock on PostgreSQL and an flock()ed lock file
+    otherwise. The lock is held on its own connection so the caller's session
+    can commit while it is held.
+    """
+    if db.engine.dialect.name == 'postgresql':
+        lock_id = _lock_id(key)
+        with db.engine.connect() as connection:
+            connection.execute(text("SELECT pg_advisory_lock(:lock_id)"), {'lock_id': lock_id})
+            try:
+                yield
+            finally:
+                connection.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {'lock_id': lock_id})
+                connection.commit()
+        return
+    
+    if fcntl is None:
+        yield
+        return
+    
+    lock_dir = lock_dir or tempfile.gettempdir()
+    path = os.path.join(lock_dir, f"trino-changes-{hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]}.lock")
+    with open(path, 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
@@ -0,0 +1,120 @@
+import hashlib
+import os
+from datetime import datetime
+from sqlalchemy import create_engine, event, text
+from config import logger
+
+# Bump when the layout of snapshot files changes; serving refuses other formats
+SNAPSHOT_FORMAT = 1
+
+SNAPSHOT_MMAP_SIZE = 256 * 1024 * 1024
+
+def snapshot_database_uri(path):
+    """SQLAlchemy URI opening a snapshot file read-only
+    
+    immutable=1 tells SQLite the file never changes, so it takes no locks and
+    every process shares the same OS page cache pages of the file.
+    """
+    return f"sqlite:///file:{os.path.abspath(path)}?mode=ro&immutable=1&uri=true"
+
+def configure_snapshot_engine(engine):
+    """Memory-map snapshot files and refuse writes on every connection"""
+    @event.listens_for(engine, 'connect')
+    def configure_connection(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA mmap_size = {SNAPSHOT_MMAP_SIZE}")
+        cursor.execute("PRAGMA query_only = 1")
+        cursor.close()
+
+def open_snapshot(engine, path):
+    """Set up the engine of a snapshot and check the file, returning its snapshot_info"""
+    configure_snapshot_engine(engine)
+    try:
+        with engine.connect() as connection:
+            row = connection.execute(text("SELECT * FROM snapshot_info")).mappings().first()
+    except Exception as e:
+        raise RuntimeError(f"Cannot read snapshot {path}: {str(e)}")
+    
+    info = dict(row) if row else {}
+    if info.get('format') != SNAPSHOT_FORMAT:
+        raise RuntimeError(f"Snapshot {path} has format {info.get('format')}, expected {SNAPSHOT_FORMAT}")
+    logger.info(f"Serving read-only snapshot {path}: {info['release_count']} releases "
+                f"up to {info['latest_version']}, created {info['created']}")
+    return info
+
+def export_snapshot(app, db, path, batch_size=1000):
+    """Write the stored releases and connector changes to a read-only SQLite snapshot at path
+    
+    The snapshot carries the same tables and indexes as the live database plus
+    the full-text search table, so every read API can be served from it. It is
+    written next to path and moved into place, so processes serving the old
+    file keep reading a complete snapshot until they are restarted.
+    Returns the snapshot_info of the new snapshot.
+    """
+    # Import models here to avoid circular imports
+    from models import ConnectorChange, ReleaseNote, TrinoVersion
+    from search import FTS_TABLE, SQLITE_FTS_DDL
+    
+    # Page HTML and cached comparisons are not needed to serve from a snapshot:
+    # comparisons are built from the stored releases
+    tables = [TrinoVersion.__table__, ReleaseNote.__table__, ConnectorChange.__table__]
+    tmp_path = f"{path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    
+    target = create_engine(f"sqlite:///{os.path.abspath(tmp_path)}")
+    try:
+        db.metadata.create_all(target, tables=tables)
+        
+        with app.app_context(), target.begin() as connection:
+            for table in tables:
+                rows = db.session.execute(table.select().order_by(table.c.id)).mappings()
+                copied = 0
+                batch = []
+                for row in rows:
+                    batch.append(dict(row))
+                    if len(batch) >= batch_size:
+                        connection.execute(table.insert(), batch)
+                        copied += len(batch)
+                        batch = []
+                if batch:
+                    connection.execute(table.insert(), batch)
+                    copied += len(batch)
+                logger.info(f"Copied {copied} rows of {table.name} to the snapshot")
+            
+            connection.execute(text(SQLITE_FTS_DDL))
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"))
+            
+            # Identify the snapshot by the releases it contains
+            digest = hashlib.sha1()
+            releases = connection.execute(text(
+                "SELECT version, content_hash FROM release_note ORDER BY version_number, version"
+            )).all()
+            for version, content_hash in releases:
+                digest.update(f"{version}:{content_hash};".encode('utf-8'))
+            info = {
+                'format': SNAPSHOT_FORMAT,
+                'created': datetime.utcnow().isoformat(),
+                'release_count': len(releases),
+                'latest_version': releases[-1][0] if releases else None,
+                'content_hash': digest.hexdigest()
+            }
+            connection.execute(text(
+                "CREATE TABLE snapshot_info (format INTEGER, created TEXT, release_count INTEGER, "
+                "latest_version TEXT, content_hash TEXT)"
+            ))
+            connection.execute(text(
+                "INSERT INTO snapshot_info VALUES (:format, :created, :release_count, :latest_version, :content_hash)"
+            ), info)
+        
+        with target.connect() as connection:
+            connection.execute(text("ANALYZE"))
+            connection.execute(text(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"))
+            connection.commit()
+            connection.execute(text("VACUUM"))
+    finally:
+        target.dispose()
+    
+    os.replace(tmp_path, path)
+    logger.info(f"Exported snapshot of {info['release_count']} releases to {path}")
+    return info
@@ -0,0 +1,63 @@
+import re
+from bs4 import BeautifulSoup
+
+# The tree-walking parser that release_parser replaced, kept as the reference
+# the single-pass parser is checked against
+
+def parse_release_notes(html):
+    """Parse a Trino release notes page into breaking, feature and connector items"""
+    release = {
+        'breaking_changes': [],
+        'new_features': [],
+        'connectors': []
+    }
+    
+    soup = BeautifulSoup(html, 'html.parser')
+    
+    # Extract breaking changes
+    breaking_section = soup.find(['h2', 'h3'], text=re.compile(r'breaking changes', re.IGNORECASE))
+    if breaking_section:
+        current = breaking_section.find_next(['p', 'ul', 'h2', 'h3'])
+        while current and current.name not in ['h2', 'h3'] or (current.name in ['h2', 'h3'] and not re.search(r'^[a-zA-Z]', current.get_text(strip=True))):
+            if current.name == 'ul':
+                for li in current.find_all('li'):
+                    release['breaking_changes'].append(li.get_text(strip=True))
+            elif current.name == 'p':
+                text = current.get_text(strip=True)
+                if text and not text.lower().startswith(('note:', 'warning:')):
+                    release['breaking_changes'].append(text)
+            current = current.find_next(['p', 'ul', 'h2', 'h3'])
+    
+    # Extract new features
+    feature_section = soup.find(['h2', 'h3'], text=re.compile(r'new features|feature changes', re.IGNORECASE))
+    if feature_section:
+        current = feature_section.find_next(['p', 'ul', 'h2', 'h3'])
+        while current and current.name not in ['h2', 'h3'] or (current.name in ['h2', 'h3'] and not re.search(r'^[a-zA-Z]', current.get_text(strip=True))):
+            if current.name == 'ul':
+                for li in current.find_all('li'):
+                    release['new_features'].append(li.get_text(strip=True))
+            current = current.find_next(['p', 'ul', 'h2', 'h3'])
+    
+    # Try to identify connector-specific sections
+    connector_sections = soup.find_all(['h2', 'h3'], text=re.compile(r'connector', re.IGNORECASE))
+    for section in connector_sections:
+        connector_name = section.get_text(strip=True)
+        # Clean up connector name (e.g., "BigQuery connector" -> "BigQuery")
+        connector_name = re.sub(r'connector', '', connector_name, flags=re.IGNORECASE).strip()
+        
+        connector_changes = []
+        current = section.find_next(['p', 'ul', 'h2', 'h3'])
+        while current and current.name not in ['h2', 'h3'] or (current.name in ['h2', 'h3'] and not re.search(r'^[a-zA-Z]', current.get_text(strip=True))):
+            if current.name == 'ul':
+                for li in current.find_all('li'):
+                    connector_changes.append(li.get_text(strip=True))
+            current = current.find_next(['p', 'ul', 'h2', 'h3'])
+        
+        if connector_changes:
+            release['connectors'].append({
+                'connector': connector_name,
+                'items': connector_changes
+            })
+    
+    return release
+
@@ -0,0 +1,66 @@
+import collections
+import logging
+import os
+import shutil
+import sys
+import pytest
+
+# The application modules import each other as top-level modules
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from page_server import FIXTURES_DIR, PageServer
+
+@pytest.fixture(scope='session')
+def page_server():
+    with PageServer() as server:
+        yield server
+
+@pytest.fixture
+def site(page_server, tmp_path):
+    """The page server, serving a copy of the fixture pages that a test may change"""
+    pages_dir = tmp_path / 'site'
+    shutil.copytree(FIXTURES_DIR, pages_dir)
+    page_server.pages_dir = str(pages_dir)
+    page_server.hits = collections.Counter()
+    page_server.faults = {}
+    return page_server
+
+@pytest.fixture(scope='session')
+def app(page_server, tmp_path_factory):
+    """The application on a scratch SQLite database, scraping from the page server"""
+    os.environ.update({
+        'DATABASE_URL': f"sqlite:///{tmp_path_factory.mktemp('db') / 'test.db'}",
+        'LOCK_DIR': str(tmp_path_factory.mktemp('locks')),
+        'TRINO_RELEASE_URL': page_server.release_url,
+        'TRINO_RELEASE_INDEX_URL': page_server.index_url,
+        'SCRAPER_HEDGE_AFTER': '0',
+        'SCRAPER_RETRIES': '0',
+        'PARSE_WORKERS': '1',
+        'SLOW_REQUEST_MS': '0',
+    })
+    os.environ.pop('SNAPSHOT_PATH', None)
+    logging.getLogger('config').setLevel(logging.WARNING)
+    
+    from main import app, init_db
+    init_db()
+    return app
+
+@pytest.fixture
+def client(app, site):
+    """A test client on an application with no stored releases and empty caches"""
+    import app as app_module
+    import fetcher
+    import scraper
+    from config import db
+    from models import ConnectorChange, ReleaseNote, ReleasePage, VersionComparison
+    
+    with app.app_context():
+        for model in (ConnectorChange, ReleaseNote, ReleasePage, VersionComparison):
+            model.query.delete()
+        db.session.commit()
+    for cache in (app_module.compare_cache, app_module.comparison_objects, app_module.release_lists_cache):
+        cache.clear()
+    app_module._newest_version = None
+    scraper._registry_generation = None
+    fetcher._breaker = None
+    return app.test_client()
@@ -0,0 +1,58 @@
+"""Write the generated release pages in generated/
+
+These are not real release notes: the text is random words in the trino.io
+page layout. They pad ranges longer than the saved pages in releases/ and give
+the tests a fixed set of versions to serve. Run from this directory.
+"""
+import os
+import random
+import sys
+
+FIRST_VERSION = 400
+LAST_VERSION = 419
+
+CONNECTORS = ['BigQuery', 'ClickHouse', 'Delta Lake', 'Elasticsearch', 'Hive', 'Iceberg', 'MySQL', 'PostgreSQL',
+              'Oracle', 'Kafka', 'SingleStore', 'Redshift', 'Pinot', 'Memory', 'Black Hole']
+WORDS = ('add support for reading writing tables partitions predicate pushdown varchar decimal timestamp improve '
+         'performance of queries fix failure when metadata cache statistics column names').split()
+
+def sentence(rng, connector=None):
+    words = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 14)))
+    if connector and rng.random() < 0.3:
+        words += f' in {connector} connector'
+    return words.capitalize()
+
+def item(rng, connector=None):
+    text = sentence(rng, connector)
+    if rng.random() < 0.2:
+        text = '⚠️ Breaking change: ' + text
+    return (f'<li><p>{text} <code>{rng.choice(WORDS)}</code>. (<a class="reference external" '
+            f'href="https://github.com/trinodb/trino/issues/{rng.randint(1, 99999)}">#{rng.randint(1, 99999)}</a>)</p></li>')
+
+def page(rng, version):
+    """One release page with the usual sections, a random set of connectors and some breaking changes"""
+    lines = ['<html><head><title>Release</title></head><body><div class="md-content"><article>',
+             f'<h1>Release {version} (1 Jan 2025)</h1>']
+    sections = ['General', 'Security', 'Web UI', 'JDBC driver'] + rng.sample(CONNECTORS, rng.randint(3, 9))
+    if version % 7 == 0:
+        sections.insert(1, 'Breaking changes')
+    if version % 5 == 0:
+        sections.insert(1, 'New features')
+    for section in sections:
+        title = section + (' connector' if section in CONNECTORS else '')
+        section_id = title.lower().replace(' ', '-')
+        lines.append(f'<section id="{section_id}"><h2>{title}</h2><ul class="simple">')
+        lines += [item(rng, section if section in CONNECTORS else None) for _ in range(rng.randint(2, 12))]
+        lines.append('</ul>')
+        if section == 'Breaking changes':
+            lines.append('<p>Note: be careful.</p><p>Some extra paragraph.</p>')
+        lines.append('</section>')
+    lines.append('</article></div><footer><h3>Trino Software Foundation</h3><p>Copyright</p></footer></body></html>')
+    return '\n'.join(lines)
+
+if __name__ == '__main__':
+    output_dir = sys.argv[1] if len(sys.argv) > 1 else 'generated'
+    rng = random.Random(1)
+    for version in range(FIRST_VERSION, LAST_VERSION + 1):
+        with open(os.path.join(output_dir, f'release-{version}.html'), 'w', encoding='utf-8') as f:
+            f.write(page(rng, version))
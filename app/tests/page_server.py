@@ -0,0 +1,98 @@
+import collections
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Generated pages, so the tests serve the same versions whether or not real pages have been saved
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'generated')
+
+class PageServer:
+    """Serve the fixture release pages on a local port, counting the requests for each page
+    
+    faults maps a page name, or '*' for any page, to the answers of its next
+    requests in order: 'ok', an HTTP status code such as '503', 'drop' to close
+    the connection without answering, or 'slow:<seconds>' to answer late.
+    """
+    
+    def __init__(self, pages_dir=FIXTURES_DIR, delay=0):
+        self.pages_dir = pages_dir
+        self.delay = delay
+        self.hits = collections.Counter()
+        self.faults = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+    
+    @property
+    def release_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/release-{{version}}.html"
+    
+    @property
+    def index_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/release.html"
+    
+    def _handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                name = os.path.basename(self.path)
+                with server._lock:
+                    server.hits[name] += 1
+                server.respond(self, name)
+        
+        return Handler
+    
+    def respond(self, handler, name):
+        """Answer a request for page name, injecting the next fault configured for it"""
+        with self._lock:
+            answers = self.faults.get(name) or self.faults.get('*')
+            answer = answers.pop(0) if answers else 'ok'
+        if answer == 'drop':
+            # The connection is closed once the handler returns
+            return
+        if answer.startswith('slow:'):
+            time.sleep(float(answer[len('slow:'):]))
+        elif answer != 'ok':
+            self.send(handler, int(answer))
+            return
+        
+        time.sleep(self.delay)
+        if name == 'release.html':
+            self.send(handler, 200, self.index().encode('utf-8'))
+            return
+        path = os.path.join(self.pages_dir, name)
+        if not os.path.exists(path):
+            self.send(handler, 404)
+            return
+        with open(path, 'rb') as f:
+            self.send(handler, 200, f.read())
+    
+    def index(self):
+        """The release notes index page, linking every page being served"""
+        links = ''.join(
+            f'<li><a href="release/{name}">{name}</a></li>'
+            for name in sorted(os.listdir(self.pages_dir)) if name.startswith('release-')
+        )
+        return f'<html><body><ul>{links}</ul></body></html>'
+    
+    @staticmethod
+    def send(handler, status, body=b''):
+        handler.send_response(status)
+        handler.send_header('Content-Type', 'text/html; charset=utf-8')
+        handler.send_header('Content-Length', str(len(body)))
+        handler.end_headers()
+        handler.wfile.write(body)
+    
+    def __enter__(self):
+        self._thread.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
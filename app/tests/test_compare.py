@@ -0,0 +1,93 @@
+import os
+import shutil
+import time
+
+def compared_versions(response):
+    """The releases that have changes in a compare response"""
+    return {
+        change['version']
+        for changes in response.get_json()['connectors'].values()
+        for section in changes.values()
+        for change in section
+    }
+
+def test_range_with_unpublished_releases_is_not_cached(app, client, site):
+    from app import comparison_objects
+    from models import VersionComparison
+    
+    response = client.get('/api/compare_versions?from_version=414&to_version=421')
+    
+    assert response.status_code == 200
+    assert response.get_json()['unpublished_versions'] == ['420', '421']
+    assert response.cache_control.no_cache
+    with app.app_context():
+        assert VersionComparison.query.count() == 0
+    
+    shutil.copy(os.path.join(site.pages_dir, 'release-419.html'), os.path.join(site.pages_dir, 'release-420.html'))
+    comparison_objects.clear()
+    response = client.get('/api/compare_versions?from_version=414&to_version=421')
+    
+    assert response.get_json()['unpublished_versions'] == ['421']
+    assert '420' in compared_versions(response)
+    assert site.hits['release-420.html'] == 2
+
+def test_cached_range_is_served_without_queries(app, client):
+    from sqlalchemy import event
+    from config import db
+    
+    url = '/api/compare_versions?from_version=400&to_version=405'
+    assert client.get(url).status_code == 200
+    
+    statements = []
+    def count(*args):
+        statements.append(args[2])
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            response = client.get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+    
+    assert response.status_code == 200
+    assert statements == []
+
+def test_uncached_range_does_not_scan_every_release(app, client):
+    from sqlalchemy import event
+    from app import compare_cache, comparison_objects
+    from config import db
+    
+    url = '/api/compare_versions?from_version=400&to_version=405'
+    assert client.get(url).status_code == 200
+    compare_cache.clear()
+    comparison_objects.clear()
+    
+    statements = []
+    def count(*args):
+        statements.append(args[2])
+    with app.app_context():
+        event.listen(db.engine, 'before_cursor_execute', count)
+        try:
+            response = client.get(url)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', count)
+    
+    assert response.status_code == 200
+    # Cheap aggregates are fine, reading the hash of every stored release is not
+    assert not [statement for statement in statements if 'release_note.content_hash' in statement and 'WHERE' not in statement]
+
+def test_range_far_past_the_newest_release_is_rejected(client):
+    response = client.get('/api/compare_versions?from_version=400&to_version=100000')
+    
+    assert response.status_code == 400
+
+def test_comparison_job_is_polled_to_completion(client):
+    job = client.post('/api/compare_jobs', data={'from_version': '400', 'to_version': '405'}).get_json()
+    for _ in range(100):
+        status = client.get(job['status_url']).get_json()
+        if status['status'] in ('done', 'failed'):
+            break
+        time.sleep(0.05)
+    
+    assert status['status'] == 'done'
+    assert status['completed'] == status['total'] == 5
+    assert status['result']['connectors']
@@ -0,0 +1,54 @@
+import multiprocessing
+import os
+import subprocess
+import sys
+import threading
+from page_server import PageServer
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROCESSES = 4
+THREADS = 4
+
+def compare_in_threads(barrier, results, from_version, to_version):
+    """Request one comparison from THREADS threads at once, putting each status code on results"""
+    # Imported here so the app is configured from the environment the test set
+    from app import app
+    
+    def compare():
+        client = app.test_client()
+        barrier.wait()
+        response = client.post('/api/compare_versions', data={'from_version': from_version, 'to_version': to_version})
+        results.put(response.status_code)
+    
+    threads = [threading.Thread(target=compare) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def test_each_page_fetched_once(tmp_path, monkeypatch):
+    with PageServer(delay=0.05) as server:
+        monkeypatch.setenv('DATABASE_URL', f"sqlite:///{tmp_path / 'test.db'}")
+        monkeypatch.setenv('LOCK_DIR', str(tmp_path))
+        monkeypatch.setenv('TRINO_RELEASE_URL', server.release_url)
+        # A hedged request would fetch a slow page twice on purpose
+        monkeypatch.setenv('SCRAPER_HEDGE_AFTER', '0')
+        monkeypatch.setenv('PARSE_WORKERS', '1')
+        subprocess.run([sys.executable, 'main.py', 'migrate'], cwd=APP_DIR, check=True, capture_output=True)
+        
+        context = multiprocessing.get_context('spawn')
+        barrier = context.Barrier(PROCESSES * THREADS)
+        results = context.Queue()
+        processes = [
+            context.Process(target=compare_in_threads, args=(barrier, results, '400', '419'))
+            for _ in range(PROCESSES)
+        ]
+        for process in processes:
+            process.start()
+        statuses = [results.get(timeout=120) for _ in range(PROCESSES * THREADS)]
+        for process in processes:
+            process.join(timeout=30)
+    
+    assert statuses == [200] * PROCESSES * THREADS
+    assert server.hits == {f"release-{version}.html": 1 for version in range(401, 420)}
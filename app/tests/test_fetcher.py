@@ -0,0 +1,103 @@
+import time
+import pytest
+import requests
+import fetcher
+from fetcher import CircuitBreaker, fetch_release_page, fetch_release_pages
+from page_server import PageServer
+
+@pytest.fixture
+def server():
+    with PageServer() as server:
+        yield server
+
+def fetch(server, version, **kwargs):
+    kwargs.setdefault('backoff', 0.01)
+    return fetch_release_page(version, server.release_url, timeout=5, session=requests.Session(), **kwargs)
+
+def test_retries_server_errors_and_dropped_connections(server):
+    server.faults['release-401.html'] = ['503', 'drop']
+    
+    result = fetch(server, '401', retries=2)
+    
+    assert result.status_code == 200 and result.html
+    assert server.hits['release-401.html'] == 3
+
+def test_gives_up_after_retries(server):
+    server.faults['release-401.html'] = ['503', '503', '503']
+    
+    assert fetch(server, '401', retries=2) is None
+    assert server.hits['release-401.html'] == 3
+
+def test_unpublished_release_is_not_retried(server):
+    result = fetch(server, '999', retries=2)
+    
+    assert result.status_code == 404 and result.html is None
+    assert server.hits['release-999.html'] == 1
+
+def test_session_pool_is_sized_by_workers_not_batch(server, monkeypatch):
+    monkeypatch.setattr(fetcher, '_session', None)
+    monkeypatch.setattr(fetcher, '_session_pool_size', 0)
+    
+    list(fetch_release_pages(['401'], server.release_url, max_workers=12))
+    
+    adapter = fetcher.get_session().get_adapter(server.release_url)
+    assert adapter.poolmanager.connection_pool_kw['maxsize'] == 24
+
+def test_slow_request_is_hedged(server):
+    server.faults['release-401.html'] = ['slow:3']
+    
+    start = time.monotonic()
+    result = fetch(server, '401', hedge_after=0.2)
+    
+    assert result.status_code == 200
+    assert time.monotonic() - start < 2
+    assert server.hits['release-401.html'] == 2
+
+def test_batch_deadline(server):
+    server.faults['release-403.html'] = ['slow:5']
+    
+    start = time.monotonic()
+    results = dict(fetch_release_pages(['401', '402', '403', '404'], server.release_url, timeout=10, deadline=1))
+    
+    assert time.monotonic() - start < 3
+    assert results['403'] is None
+    assert all(results[version].status_code == 200 for version in ('401', '402', '404'))
+
+def test_breaker_opens_half_opens_and_closes(server):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.3)
+    server.faults['release-401.html'] = ['503', '503']
+    
+    assert fetch(server, '401', breaker=breaker) is None
+    assert breaker.state == 'closed'
+    assert fetch(server, '401', breaker=breaker) is None
+    assert breaker.state == 'open'
+    
+    # While open nothing reaches the site
+    assert fetch(server, '402', breaker=breaker) is None
+    assert server.hits['release-402.html'] == 0
+    
+    # A failed trial opens the breaker again
+    time.sleep(0.35)
+    assert breaker.state == 'half-open'
+    server.faults['release-402.html'] = ['503']
+    assert fetch(server, '402', breaker=breaker) is None
+    assert breaker.state == 'open'
+    
+    # A successful trial closes it
+    time.sleep(0.35)
+    assert fetch(server, '402', breaker=breaker).status_code == 200
+    assert breaker.state == 'closed'
+    assert server.hits['release-402.html'] == 2
+
+def test_expired_deadline_does_not_use_up_the_breaker_trial(server):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.1)
+    server.faults['release-401.html'] = ['503']
+    assert fetch(server, '401', breaker=breaker) is None
+    time.sleep(0.15)
+    assert breaker.state == 'half-open'
+    
+    assert fetch(server, '402', breaker=breaker, deadline=time.monotonic() - 1) is None
+    
+    assert fetch(server, '402', breaker=breaker).status_code == 200
+    assert breaker.state == 'closed'
+    assert server.hits['release-402.html'] == 1
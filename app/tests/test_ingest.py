@@ -0,0 +1,41 @@
+import os
+from datetime import datetime, timedelta
+
+def stored_versions(app):
+    from models import ReleaseNote
+    
+    with app.app_context():
+        return sorted(note.version for note in ReleaseNote.query.all())
+
+def test_ingest_fills_gaps_below_releases_scraped_on_demand(app, client):
+    from config import db
+    from scraper import ingest_releases
+    
+    assert client.get('/api/compare_versions?from_version=410&to_version=412').status_code == 200
+    assert stored_versions(app) == ['411', '412']
+    
+    ingested = ingest_releases(app, db)
+    
+    assert len(ingested) == 18 and '400' in ingested and '411' not in ingested
+    assert stored_versions(app) == [str(version) for version in range(400, 420)]
+
+def test_ingest_revalidates_old_pages(app, client, site):
+    from config import db
+    from models import ReleaseNote, ReleasePage
+    from scraper import ingest_releases
+    
+    ingest_releases(app, db)
+    with app.app_context():
+        ReleasePage.query.filter_by(version='405').first().check_date = datetime.utcnow() - timedelta(days=60)
+        db.session.commit()
+    page = os.path.join(site.pages_dir, 'release-405.html')
+    with open(page, encoding='utf-8') as f:
+        html = f.read()
+    with open(page, 'w', encoding='utf-8') as f:
+        f.write(html.replace('<li><p>', '<li><p>Edited: '))
+    
+    assert ingest_releases(app, db) == []
+    assert ingest_releases(app, db, revalidate=True) == ['405']
+    with app.app_context():
+        release = ReleaseNote.query.filter_by(version='405').first().get_release_data()
+    assert release['new_features'] and all(item.startswith('Edited: ') for item in release['new_features'])
@@ -0,0 +1,41 @@
+import pytest
+from bench import DEFAULT_CORPUS, GENERATED_CORPUS, load_pages
+from release_parser import parse_release_notes
+
+pytest.importorskip('bs4')
+import bs4_release_parser
+
+# The reference parser is kept as it was, including its use of the deprecated text= argument
+pytestmark = pytest.mark.filterwarnings('ignore::DeprecationWarning')
+
+# Pages saved from trino.io, then the generated ones labelled as such
+PAGES = load_pages(DEFAULT_CORPUS) + [(f'generated-{version}', html) for version, html in load_pages(GENERATED_CORPUS)]
+
+def unique(items):
+    """items without repeats, in order"""
+    seen = []
+    for item in items:
+        if item not in seen:
+            seen.append(item)
+    return seen
+
+@pytest.mark.parametrize('version,html', PAGES, ids=[version for version, _ in PAGES])
+def test_matches_bs4_parser(version, html):
+    expected = bs4_release_parser.parse_release_notes(html)
+    # The BS4 parser reported a paragraph inside a breaking change list item a
+    # second time; the single-pass parser reports every item once
+    expected['breaking_changes'] = unique(expected['breaking_changes'])
+    
+    assert parse_release_notes(html) == expected
+
+def test_breaking_change_paragraph_reported_once():
+    html = (
+        '<h2>Breaking changes</h2>'
+        '<ul><li><p>Remove the <code>legacy</code> property.</p></li></ul>'
+        '<h2>General</h2>'
+    )
+    
+    assert bs4_release_parser.parse_release_notes(html)['breaking_changes'] == [
+        'Remove thelegacyproperty.', 'Remove thelegacyproperty.'
+    ]
+    assert parse_release_notes(html)['breaking_changes'] == ['Remove thelegacyproperty.']
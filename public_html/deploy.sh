@@ -86,7 +86,8 @@ fi
 
 # 6. Copy application files to public_html
 log "Copying application files..."
-for file in app.py config.py main.py models.py scraper.py; do
+# Every module is copied, so a newly added one cannot be left out
+for file in *.py; do
     if [ -f "$file" ]; then
         cp $file $PUBLIC_HTML_PATH/
     else
@@ -133,6 +134,10 @@ else
     warning "config.py not found, couldn't update DATABASE_URL."
 fi
 
+# Create the tables; web processes no longer do this when they start
+log "Migrating the database schema..."
+(cd $PUBLIC_HTML_PATH && $VENV_PATH/bin/python main.py migrate) || error "Database migration failed"
+
 # 9. Set permissions
 log "Setting permissions..."
 chown -R www-data:www-data $APP_PATH
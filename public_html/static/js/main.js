@@ -1,4 +1,7 @@
 $(document).ready(function() {
+    // How often a running comparison job is polled for progress
+    const JOB_POLL_INTERVAL_MS = 1000;
+    
     // Handle form submission
     $('#comparisonForm').on('submit', function(e) {
         e.preventDefault();
@@ -12,45 +15,145 @@ $(document).ready(function() {
         }
         
         // Show loading overlay
+        $('#loadingProgress').text('');
         $('#loadingOverlay').show();
         
         // Clear previous results
         $('#connector-list').html('');
         $('#connector-details').html('');
         
-        // Make AJAX request to compare versions
+        // Compare with the older version first so cached results are shared
+        const versions = [fromVersion, toVersion].sort((a, b) => parseInt(a) - parseInt(b));
+        startComparisonJob(versions[0], versions[1]);
+    });
+    
+    // Show a finished comparison
+    function showComparison(data) {
+        // Update comparison header
+        $('#comparison-header').text(`Changes from Trino ${data.from_version} to Trino ${data.to_version}`);
+        
+        showIncompleteWarning(data);
+        
+        // Process connector data
+        processConnectorData(data);
+        
+        // Show results
+        $('#comparison-results').show();
+        
+        // Hide loading overlay
+        $('#loadingOverlay').hide();
+        
+        // Scroll to results
+        $('html, body').animate({
+            scrollTop: $('#comparison-results').offset().top - 20
+        }, 500);
+    }
+    
+    // Releases that could not be fetched in time are left out (missing) or shown
+    // from an older stored copy (stale), and releases not out yet are left out
+    // (unpublished); comparing again later retries them
+    function showIncompleteWarning(data) {
+        const warning = $('#comparison-warning');
+        const messages = [];
+        if (data.missing_versions && data.missing_versions.length) {
+            messages.push(`Release notes could not be loaded for ${data.missing_versions.join(', ')}; their changes are not shown.`);
+        }
+        if (data.unpublished_versions && data.unpublished_versions.length) {
+            messages.push(`Releases ${data.unpublished_versions.join(', ')} are not published yet.`);
+        }
+        if (data.stale_versions && data.stale_versions.length) {
+            messages.push(`Release notes for ${data.stale_versions.join(', ')} could not be refreshed and may be out of date.`);
+        }
+        if (messages.length === 0) {
+            warning.hide();
+            return;
+        }
+        warning.html(`
+            <i class="fas fa-exclamation-triangle me-2"></i>
+            ${messages.map(escapeHtml).join(' ')} Try the comparison again later for complete results.
+        `).show();
+    }
+    
+    function comparisonFailed(message) {
+        // Hide loading overlay
+        $('#loadingOverlay').hide();
+        
+        // Show error message
+        alert('Error comparing versions: ' + message);
+    }
+    
+    // Make AJAX request to compare versions; GET so the response can be
+    // cached by the browser and the CDN
+    function fetchComparison(fromVersion, toVersion) {
         $.ajax({
             url: '/api/compare_versions',
+            type: 'GET',
+            data: { from_version: fromVersion, to_version: toVersion, summary: 'true' },
+            dataType: 'json',
+            success: showComparison,
+            error: function(xhr, status, error) {
+                comparisonFailed(xhr.responseJSON ? xhr.responseJSON.error : error);
+            }
+        });
+    }
+    
+    // Start a background comparison job and poll its progress; polling, unlike
+    // the job's event stream, does not hold a web server thread while it runs
+    function startComparisonJob(fromVersion, toVersion) {
+        $.ajax({
+            url: '/api/compare_jobs',
             type: 'POST',
-            data: $(this).serialize(),
+            data: { from_version: fromVersion, to_version: toVersion },
             dataType: 'json',
-            success: function(data) {
-                // Update comparison header
-                $('#comparison-header').text(`Changes from Trino ${data.from_version} to Trino ${data.to_version}`);
-                
-                // Process connector data
-                processConnectorData(data);
-                
-                // Show results
-                $('#comparison-results').show();
-                
-                // Hide loading overlay
-                $('#loadingOverlay').hide();
-                
-                // Scroll to results
-                $('html, body').animate({
-                    scrollTop: $('#comparison-results').offset().top - 20
-                }, 500);
+            success: function(job) {
+                updateComparisonProgress(job.completed, job.total);
+                pollComparisonJob(job.status_url, fromVersion, toVersion);
             },
             error: function(xhr, status, error) {
-                // Hide loading overlay
-                $('#loadingOverlay').hide();
-                
-                // Show error message
-                alert('Error comparing versions: ' + (xhr.responseJSON ? xhr.responseJSON.error : error));
+                if (xhr.status === 503) {
+                    // The job pool is saturated; fall back to a plain request
+                    fetchComparison(fromVersion, toVersion);
+                } else {
+                    comparisonFailed(xhr.responseJSON ? xhr.responseJSON.error : error);
+                }
             }
         });
-    });
+    }
+    
+    function pollComparisonJob(statusUrl, fromVersion, toVersion) {
+        setTimeout(function() {
+            $.ajax({
+                url: statusUrl,
+                type: 'GET',
+                dataType: 'json',
+                cache: false,
+                success: function(job) {
+                    if (job.status === 'done') {
+                        showComparison(job.result);
+                    } else if (job.status === 'failed') {
+                        comparisonFailed(job.error);
+                    } else {
+                        updateComparisonProgress(job.completed, job.total);
+                        pollComparisonJob(statusUrl, fromVersion, toVersion);
+                    }
+                },
+                error: function(xhr, status, error) {
+                    if (xhr.status === 404) {
+                        // The job expired or was accepted by another process
+                        fetchComparison(fromVersion, toVersion);
+                    } else {
+                        comparisonFailed(xhr.responseJSON ? xhr.responseJSON.error : error);
+                    }
+                }
+            });
+        }, JOB_POLL_INTERVAL_MS);
+    }
+    
+    function updateComparisonProgress(completed, total) {
+        if (total > 0) {
+            $('#loadingProgress').text(`Processed ${completed} of ${total} releases`);
+        }
+    }
     
     // Handle connector search
     $('#connector-search').on('input', function() {
@@ -67,11 +170,35 @@ $(document).ready(function() {
     });
     
     // Function to process and display connector data
+    // Changes of a connector are loaded in pages of this size when it comes into view
+    const DETAIL_PAGE_SIZE = 200;
+    // Lists longer than this only keep the rows in view in the DOM
+    const VIRTUALIZE_THRESHOLD = 100;
+    // Rows rendered above and below the visible part of a virtualized list
+    const VIRTUAL_BUFFER = 10;
+    
+    let detailObserver = null;
+    
+    function escapeHtml(text) {
+        return $('<div>').text(text).html();
+    }
+    
+    function connectorId(connector) {
+        return 'connector-' + connector.replace(/[^A-Za-z0-9_-]+/g, '-');
+    }
+    
+    // Render the per-connector counts of a summary compare response; the
+    // changes of each connector are loaded once its section comes into view
     function processConnectorData(data) {
         const connectors = data.connectors;
         const connectorList = $('#connector-list');
         const connectorDetails = $('#connector-details');
         
+        if (detailObserver) {
+            detailObserver.disconnect();
+            detailObserver = null;
+        }
+        
         if (!connectors || Object.keys(connectors).length === 0) {
             connectorDetails.html(`
                 <div class="alert alert-info">
@@ -91,13 +218,13 @@ $(document).ready(function() {
         
         // Populate connector list
         sortedConnectors.forEach(connector => {
-            const breakingCount = connectors[connector].breaking_changes.length;
-            const featureCount = connectors[connector].new_features.length;
+            const breakingCount = connectors[connector].breaking_changes;
+            const featureCount = connectors[connector].new_features;
             const totalCount = breakingCount + featureCount;
             
             const connectorItem = $(`
-                <a href="#${connector.replace(/\s+/g, '-')}" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center connector-link">
-                    ${connector}
+                <a href="#${connectorId(connector)}" class="list-group-item list-group-item-action d-flex justify-content-between align-items-center connector-link">
+                    ${escapeHtml(connector)}
                     <span class="badge bg-primary rounded-pill">${totalCount}</span>
                 </a>
             `);
@@ -111,59 +238,44 @@ $(document).ready(function() {
             connectorList.append(connectorItem);
         });
         
-        // Populate connector details
+        // Populate connector sections with placeholders for their changes
         sortedConnectors.forEach(connector => {
-            const connectorData = connectors[connector];
-            const connectorId = connector.replace(/\s+/g, '-');
+            const counts = connectors[connector];
             
             const connectorSection = $(`
-                <div class="connector-section" id="${connectorId}">
+                <div class="connector-section" id="${connectorId(connector)}">
                     <div class="card connector-card">
                         <div class="card-header">
                             <div class="connector-title">
                                 <i class="fas fa-plug me-2"></i>
-                                <h3 class="mb-0">${connector} Connector</h3>
+                                <h3 class="mb-0">${escapeHtml(connector)} Connector</h3>
                             </div>
                             <div>
-                                <span class="badge bg-danger">${connectorData.breaking_changes.length} Breaking</span>
-                                <span class="badge bg-success">${connectorData.new_features.length} Features</span>
+                                <span class="badge bg-danger">${counts.breaking_changes} Breaking</span>
+                                <span class="badge bg-success">${counts.new_features} Features</span>
                             </div>
                         </div>
                         <div class="card-body">
                             <div class="changes-container">
                                 <!-- Breaking changes -->
-                                ${connectorData.breaking_changes.length > 0 ? `
+                                ${counts.breaking_changes > 0 ? `
                                     <h4 class="text-danger mb-3">
                                         <i class="fas fa-exclamation-triangle me-2"></i>
                                         Breaking Changes
                                     </h4>
-                                    <div class="breaking-changes mb-4">
-                                        ${connectorData.breaking_changes.map(change => `
-                                            <div class="change-item breaking">
-                                                <span class="version-pill badge bg-secondary">v${change.version}</span>
-                                                <p class="mb-0">${change.description}</p>
-                                            </div>
-                                        `).join('')}
-                                    </div>
+                                    <div class="breaking-changes change-list mb-4" data-section="breaking_changes" data-total="${counts.breaking_changes}"></div>
                                 ` : ''}
                                 
                                 <!-- New features -->
-                                ${connectorData.new_features.length > 0 ? `
+                                ${counts.new_features > 0 ? `
                                     <h4 class="text-success mb-3">
                                         <i class="fas fa-star me-2"></i>
                                         New Features
                                     </h4>
-                                    <div class="new-features">
-                                        ${connectorData.new_features.map(feature => `
-                                            <div class="change-item feature">
-                                                <span class="version-pill badge bg-secondary">v${feature.version}</span>
-                                                <p class="mb-0">${feature.description}</p>
-                                            </div>
-                                        `).join('')}
-                                    </div>
+                                    <div class="new-features change-list" data-section="new_features" data-total="${counts.new_features}"></div>
                                 ` : ''}
                                 
-                                ${connectorData.breaking_changes.length === 0 && connectorData.new_features.length === 0 ? `
+                                ${counts.breaking_changes === 0 && counts.new_features === 0 ? `
                                     <div class="alert alert-info">
                                         <i class="fas fa-info-circle me-2"></i>
                                         No changes detected for this connector between these versions.
@@ -174,20 +286,178 @@ $(document).ready(function() {
                     </div>
                 </div>
             `);
+            connectorSection.data('connector', connector);
+            connectorSection.find('.change-list').html(loadingPlaceholder());
             
             connectorDetails.append(connectorSection);
         });
         
+        // Load the changes of a connector when its section is about to scroll into view
+        const sections = connectorDetails.find('.connector-section');
+        if (window.IntersectionObserver) {
+            detailObserver = new IntersectionObserver(function(entries) {
+                entries.forEach(entry => {
+                    if (entry.isIntersecting) {
+                        detailObserver.unobserve(entry.target);
+                        loadConnectorDetails($(entry.target), data);
+                    }
+                });
+            }, { rootMargin: '400px 0px' });
+            sections.each(function() {
+                detailObserver.observe(this);
+            });
+        } else {
+            sections.each(function() {
+                loadConnectorDetails($(this), data);
+            });
+        }
+        
         // Attach click event to connector links
         $('.connector-link').on('click', function(e) {
             e.preventDefault();
-            const target = $(this).attr('href');
+            const target = $($(this).attr('href'));
+            loadConnectorDetails(target, data);
             $('html, body').animate({
-                scrollTop: $(target).offset().top - 20
+                scrollTop: target.offset().top - 20
             }, 400);
         });
     }
     
+    function loadingPlaceholder() {
+        return `
+            <div class="text-muted small py-2 change-list-loading">
+                <span class="spinner-border spinner-border-sm me-2" role="status"></span>
+                Loading changes...
+            </div>
+        `;
+    }
+    
+    function loadConnectorDetails(section, data) {
+        if (section.data('loaded')) {
+            return;
+        }
+        section.data('loaded', true);
+        
+        section.find('.change-list').each(function() {
+            createChangeList($(this), {
+                from_version: data.from_version,
+                to_version: data.to_version,
+                connector: section.data('connector'),
+                section: $(this).data('section')
+            }, parseInt($(this).data('total')));
+        });
+    }
+    
+    // Show the changes of one section of a connector, fetching them page by page.
+    // Long lists are virtualized: only the rows around the visible part of the
+    // list are rendered, and further pages are fetched as the user scrolls.
+    function createChangeList(container, params, total) {
+        const items = [];
+        const itemClass = params.section === 'breaking_changes' ? 'breaking' : 'feature';
+        const virtualized = total > VIRTUALIZE_THRESHOLD;
+        let nextPage = 1;
+        let loading = false;
+        let rowHeight = 72;
+        let renderPending = false;
+        
+        function renderItem(change) {
+            return `
+                <div class="change-item ${itemClass}">
+                    <span class="version-pill badge bg-secondary">v${escapeHtml(change.version)}</span>
+                    <p class="mb-0">${escapeHtml(change.description)}</p>
+                </div>
+            `;
+        }
+        
+        function loadNextPage() {
+            if (loading || items.length >= total) {
+                return;
+            }
+            loading = true;
+            $.ajax({
+                url: '/api/compare_connector',
+                type: 'GET',
+                data: $.extend({ page: nextPage, per_page: DETAIL_PAGE_SIZE }, params),
+                dataType: 'json',
+                success: function(data) {
+                    const page = data[params.section];
+                    items.push(...page.items);
+                    // The stored releases may have changed since the summary was built
+                    total = page.total;
+                    nextPage += 1;
+                    loading = false;
+                    render();
+                    if (virtualized && nextPage === 2) {
+                        // The viewport only has its real height once the first rows are in
+                        render();
+                    }
+                    if (!virtualized && data.has_more) {
+                        loadNextPage();
+                    }
+                },
+                error: function(xhr, status, error) {
+                    loading = false;
+                    container.html(`
+                        <div class="alert alert-warning mb-0">
+                            Error loading changes: ${escapeHtml(xhr.responseJSON ? xhr.responseJSON.error : error)}
+                        </div>
+                    `);
+                }
+            });
+        }
+        
+        function render() {
+            if (!virtualized) {
+                container.html(items.map(renderItem).join('') + (items.length < total ? loadingPlaceholder() : ''));
+                return;
+            }
+            
+            const scrollTop = viewport.scrollTop();
+            const first = Math.max(0, Math.floor(scrollTop / rowHeight) - VIRTUAL_BUFFER);
+            const last = Math.min(total, Math.ceil((scrollTop + viewport.innerHeight()) / rowHeight) + VIRTUAL_BUFFER);
+            const end = Math.min(last, items.length);
+            
+            topSpacer.height(first * rowHeight);
+            rows.html(items.slice(first, end).map(renderItem).join('') + (end < last ? loadingPlaceholder() : ''));
+            bottomSpacer.height(Math.max(0, total - Math.max(first, end)) * rowHeight);
+            
+            // Refine the row height estimate from the rows just rendered
+            const rendered = rows.children('.change-item');
+            if (rendered.length) {
+                let height = 0;
+                rendered.each(function() {
+                    height += $(this).outerHeight(true);
+                });
+                rowHeight = Math.max(height / rendered.length, 20);
+            }
+            
+            if (last > items.length) {
+                loadNextPage();
+            }
+        }
+        
+        let viewport, topSpacer, rows, bottomSpacer;
+        if (virtualized) {
+            viewport = $('<div class="virtual-list"></div>');
+            topSpacer = $('<div></div>');
+            rows = $('<div></div>');
+            bottomSpacer = $('<div></div>');
+            viewport.append(topSpacer, rows, bottomSpacer);
+            container.empty().append(viewport);
+            viewport.on('scroll', function() {
+                if (!renderPending) {
+                    renderPending = true;
+                    window.requestAnimationFrame(function() {
+                        renderPending = false;
+                        render();
+                    });
+                }
+            });
+        }
+        
+        loadNextPage();
+    }
+    
     // Expand/collapse all functionality
     $('#expand-all').on('click', function() {
         $('.collapse').collapse('show');